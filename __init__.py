@@ -1,6 +1,13 @@
-from .game import GamePlugin
-from .installer import ArchiveInstaller
-
-
 def createPlugins():
-    return [GamePlugin(), ArchiveInstaller()]
+    # Imported here so the mod and game helpers can be used without MO2
+    from .game.plugin import GamePlugin
+    from .installer import ArchiveInstaller
+    from .saves import SaveArchiveTool
+    from .workshop import WorkshopTool
+
+    return [
+        GamePlugin(),
+        ArchiveInstaller(),
+        SaveArchiveTool(),
+        WorkshopTool(),
+    ]
@@ -0,0 +1,146 @@
+import argparse
+import io
+import os
+import random
+import sys
+import zipfile
+
+from typing import List
+
+# Synthetic Crusader Kings III saves, laid out like the real thing: a
+# SAV header line, the meta_data block, then the gamestate (plain text,
+# zipped or binary). Sizes are those of the uncompressed gamestate.
+
+TEXT: str = "text"
+COMPRESSED: str = "compressed"
+BINARY: str = "binary"
+AUTOSAVE: str = "autosave"
+NO_META: str = "no_meta"
+LATE_META: str = "late_meta"
+
+VARIANTS: List[str] = [TEXT, COMPRESSED, BINARY, AUTOSAVE, NO_META, LATE_META]
+
+_SAVE_TYPES = {
+    TEXT: 0,
+    BINARY: 1,
+    COMPRESSED: 2,
+    AUTOSAVE: 0,
+    NO_META: 0,
+    LATE_META: 0,
+}
+
+_NAMES = ["Harold", "William", "Sweyn", "Matilda", "Edith", "Olaf"]
+_TITLES = ["England", "Normandy", "Denmark", "Norway", "Scotland"]
+
+
+def meta_block(rng: random.Random) -> str:
+    return "\n".join(
+        [
+            "meta_data={",
+            "\tsave_game_version=3",
+            '\tversion="1.9.2.1"',
+            "\tmeta_date={}.{}.{}".format(
+                rng.randint(867, 1452), rng.randint(1, 12), rng.randint(1, 28)
+            ),
+            '\tmeta_player_name="{} {}"'.format(
+                rng.choice(["Duke", "King", "Count"]), rng.choice(_NAMES)
+            ),
+            '\tmeta_title_name="Kingdom of {}"'.format(rng.choice(_TITLES)),
+            "\tmeta_coat_of_arms={",
+            '\t\tpattern="pattern_solid.dds"',
+            "\t}",
+            '\tmeta_house_name="Godwinson"',
+            "}",
+            "",
+        ]
+    )
+
+
+def write_gamestate(f, size: int, rng: random.Random):
+    written = 0
+    character = 0
+    while written < size:
+        character += 1
+        chunk = "".join(
+            "{}={{\n\tfirst_name=\"{}\"\n\tbirth={}.{}.{}\n"
+            "\tdynasty_house={}\n\tskill={{ {} {} {} {} {} {} }}\n}}\n".format(
+                character * 64 + i,
+                rng.choice(_NAMES),
+                rng.randint(800, 1400),
+                rng.randint(1, 12),
+                rng.randint(1, 28),
+                rng.randint(1, 100000),
+                *(rng.randint(0, 30) for _ in range(6)),
+            )
+            for i in range(64)
+        ).encode()
+        f.write(chunk)
+        written += len(chunk)
+
+
+def generate(path: str, size: int, variant: str, seed: int = 0):
+    rng = random.Random(seed)
+    meta = meta_block(rng)
+    header = "SAV01{:02x}{:08x}{:08x}\n".format(
+        _SAVE_TYPES[variant], rng.getrandbits(32), len(meta)
+    )
+
+    with open(path, "wb") as f:
+        f.write(header.encode())
+        if variant == BINARY:
+            # Binary token stream, no text meta_data to find
+            remaining = size
+            while remaining > 0:
+                block = min(remaining, 1024 * 1024)
+                f.write(rng.randbytes(block))
+                remaining -= block
+            return
+
+        if variant not in (NO_META, LATE_META):
+            f.write(meta.encode())
+
+        if variant == COMPRESSED:
+            gamestate = io.BytesIO()
+            write_gamestate(gamestate, size, rng)
+            with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("gamestate", gamestate.getvalue())
+            return
+
+        write_gamestate(f, size, rng)
+        if variant == LATE_META:
+            f.write(meta.encode())
+
+
+def file_name(size: int, variant: str, index: int = 0) -> str:
+    prefix = "autosave" if variant == AUTOSAVE else "save"
+    return "{}_{}_{}mb_{}.ck3".format(prefix, variant, size >> 20, index)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write synthetic Crusader Kings III saves"
+    )
+    parser.add_argument("directory")
+    parser.add_argument(
+        "--size-mb", type=int, action="append", default=None
+    )
+    parser.add_argument(
+        "--variant", action="append", choices=VARIANTS, default=None
+    )
+    parser.add_argument("--count", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.directory, exist_ok=True)
+    for size_mb in args.size_mb or [1]:
+        for variant in args.variant or VARIANTS:
+            for index in range(args.count):
+                path = os.path.join(
+                    args.directory, file_name(size_mb << 20, variant, index)
+                )
+                generate(path, size_mb << 20, variant, seed=index)
+                print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
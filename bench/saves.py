@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from typing import Dict, List
+
+from . import savegen
+
+# Benchmarks SaveGame construction and GamePlugin.listSaves over synthetic
+# saves. Needs mobase and PyQt, so run it with the Python that MO2 uses:
+#   python -m <plugin folder>.bench.saves --size-mb 1 --size-mb 100
+
+
+def _measure(function) -> Dict:
+    # Timed without tracemalloc, which slows allocation-heavy parsing down
+    # several times, then run again for the peak memory
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "result": result,
+        "ms": round(elapsed * 1000, 3),
+        "peak_kb": peak >> 10,
+    }
+
+
+def bench_save_game(directory: str, sizes: List[int]) -> List[Dict]:
+    from ..game.save import SaveGame
+
+    results = []
+    for size in sizes:
+        for variant in savegen.VARIANTS:
+            path = os.path.join(directory, savegen.file_name(size, variant))
+            if not os.path.exists(path):
+                savegen.generate(path, size, variant)
+
+            measured = _measure(lambda: SaveGame(path).valid())
+            results.append(
+                {
+                    "operation": "SaveGame",
+                    "variant": variant,
+                    "size_mb": size >> 20,
+                    "file_bytes": os.path.getsize(path),
+                    "valid": measured["result"],
+                    "ms": measured["ms"],
+                    "peak_kb": measured["peak_kb"],
+                }
+            )
+    return results
+
+
+def bench_list_saves(directory: str, size: int, count: int) -> List[Dict]:
+    try:
+        from PyQt6.QtCore import QDir
+    except Exception:
+        from PyQt5.QtCore import QDir
+
+    from ..game.plugin import GamePlugin
+
+    saves_dir = os.path.join(directory, "list_{}mb".format(size >> 20))
+    os.makedirs(saves_dir, exist_ok=True)
+    for index in range(count):
+        variant = savegen.VARIANTS[index % len(savegen.VARIANTS)]
+        name = savegen.file_name(size, variant, index)
+        path = os.path.join(saves_dir, name)
+        if not os.path.exists(path):
+            savegen.generate(path, size, variant, seed=index)
+
+    plugin = GamePlugin()
+    measured = _measure(lambda: len(plugin.listSaves(QDir(saves_dir))))
+    return [
+        {
+            "operation": "listSaves",
+            "size_mb": size >> 20,
+            "saves": measured["result"],
+            "ms": measured["ms"],
+            "peak_kb": measured["peak_kb"],
+        }
+    ]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark save parsing over synthetic saves"
+    )
+    parser.add_argument(
+        "--size-mb", type=int, action="append", default=None
+    )
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument(
+        "--directory",
+        default="",
+        help="where generated saves are kept between runs",
+    )
+    parser.add_argument("--output", default="", help="JSON results file")
+    args = parser.parse_args(argv)
+
+    sizes = [size_mb << 20 for size_mb in args.size_mb or [1, 10, 100]]
+    directory = args.directory or tempfile.mkdtemp(prefix="ck3_saves_")
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        results = bench_save_game(directory, sizes)
+        for size in sizes:
+            results.extend(bench_list_saves(directory, size, args.count))
+    finally:
+        # Generated saves are only kept when asked for
+        if not args.directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        "benchmark": "saves",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
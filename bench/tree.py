@@ -0,0 +1,182 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from typing import Callable, Dict, List
+
+from ..mod import ModDataChecker, TreeHelper
+from ..mod.fstree import IFileTree
+
+# Benchmarks for the TreeHelper hot paths over synthetic in-memory trees.
+# Run from the folder containing the plugin:
+#   python -m <plugin folder>.bench.tree --output results.json
+
+
+# Synthetic Trees
+
+
+def _add_content(tree: IFileTree, prefix: str, files: int):
+    # Spreads files over a realistic mix of content directories
+    weights = [
+        ("gfx/models/units", 40),
+        ("gfx/interface/icons", 20),
+        ("common/traits", 10),
+        ("events", 10),
+        ("localization/english", 10),
+        ("history/characters", 5),
+        ("gui", 5),
+    ]
+    total = sum(weight for _, weight in weights)
+    for directory, weight in weights:
+        count = max(1, files * weight // total)
+        for i in range(count):
+            sub = "{}/{}/{:03d}".format(prefix, directory, i // 200)
+            tree.addFile("{}/file_{}.txt".format(sub, i), size=1024)
+
+
+def flat(files: int) -> IFileTree:
+    tree = IFileTree()
+    _add_content(tree, "", files)
+    return tree
+
+
+def wrapped(files: int) -> IFileTree:
+    tree = IFileTree()
+    tree.addFile("Wrapper/Inner/MyMod.mod", size=200)
+    tree.addFile("Wrapper/Inner/thumbnail.png", size=50000)
+    tree.addFile("Wrapper/Inner/readme.txt", size=100)
+    _add_content(tree, "Wrapper/Inner/MyMod", files)
+    return tree
+
+
+def deep_descriptor(files: int) -> IFileTree:
+    # The deep descriptor search has to get through a big gfx tree first
+    tree = IFileTree()
+    _add_content(tree, "AAssets", files)
+    tree.addFile("ZMod/Inner/Deeper/descriptor.mod", size=200)
+    tree.addFile("ZMod/Inner/Deeper/thumbnail.png", size=50000)
+    _add_content(tree, "ZMod/Inner/Deeper", files // 10)
+    return tree
+
+
+def total_conversion(files: int) -> IFileTree:
+    tree = IFileTree()
+    tree.addFile("descriptor.mod", size=200)
+    tree.addFile("thumbnail.png", size=50000)
+    _add_content(tree, "", files)
+    return tree
+
+
+SHAPES: Dict[str, Callable[[int], IFileTree]] = {
+    "flat": flat,
+    "wrapped": wrapped,
+    "deep_descriptor": deep_descriptor,
+    "total_conversion": total_conversion,
+}
+
+SIZES: Dict[str, int] = {
+    "flat": 2000,
+    "wrapped": 2000,
+    "deep_descriptor": 20000,
+    "total_conversion": 100000,
+}
+
+OPERATIONS: Dict[str, Callable[[IFileTree], object]] = {
+    "can_be_installable": TreeHelper.can_be_installable,
+    "to_installable": TreeHelper.to_installable,
+    "to_final": TreeHelper.to_final,
+    "find_thumbnail": TreeHelper.find_thumbnail,
+    "dataLooksValid": ModDataChecker().dataLooksValid,
+}
+
+# Flat trees are already final and have no descriptor, the installer
+# never calls to_final on them
+SKIPPED: Dict[str, List[str]] = {
+    "flat": ["to_final"],
+}
+
+
+# Runner
+
+
+def run(
+    shapes: List[str], scale: float = 1.0, repeat: int = 3
+) -> List[Dict]:
+    results = []
+    for shape in shapes:
+        tree = SHAPES[shape](max(1, int(SIZES[shape] * scale)))
+        entries = sum(1 for _ in tree.walk())
+        for operation, function in OPERATIONS.items():
+            if operation in SKIPPED.get(shape, []):
+                continue
+            # Entries visited by the helpers, as counted for Instrumentation
+            visited = TreeHelper.visited
+            TreeHelper.counting = True
+            try:
+                function(tree)
+            except Exception as e:
+                results.append(
+                    {
+                        "shape": shape,
+                        "operation": operation,
+                        "entries": entries,
+                        "error": repr(e),
+                    }
+                )
+                continue
+            finally:
+                TreeHelper.counting = False
+            visited = TreeHelper.visited - visited
+
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                function(tree)
+                timings.append(time.perf_counter() - start)
+
+            results.append(
+                {
+                    "shape": shape,
+                    "operation": operation,
+                    "entries": entries,
+                    "visited": visited,
+                    "min_ms": round(min(timings) * 1000, 3),
+                    "max_ms": round(max(timings) * 1000, 3),
+                }
+            )
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark TreeHelper over synthetic archive trees"
+    )
+    parser.add_argument(
+        "--shape", action="append", choices=list(SHAPES), default=None
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="", help="JSON results file")
+    args = parser.parse_args(argv)
+
+    report = {
+        "benchmark": "tree",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "scale": args.scale,
+        "results": run(args.shape or list(SHAPES), args.scale, args.repeat),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,2 @@
-from .plugin import GamePlugin  # noqa: F401  # type: ignore
+# GamePlugin is imported from .plugin by createPlugins, so the Qt-free
+# modules in here (savefile, saveindex, compaction) load without MO2
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import zipfile
+
+from typing import Dict, List
+
+from ..jsonfile import read_json, write_json
+from .savefile import SaveFile
+
+# Moves all but the newest saves of each character/title group into a
+# zip per group, with a JSON manifest next to it so archived saves can be
+# listed without opening the zip. Restored saves stay in the zip, marked
+# in the manifest, and are pinned (by mtime) so the next compaction leaves
+# them alone until the game overwrites them.
+# Usable headless:
+#   python -m <plugin folder>.game.compaction compact <saves folder> --keep 5
+
+ARCHIVE_DIR: str = "archive"
+PINS_FILE: str = "restored.json"
+
+
+def group_file_name(group: str) -> str:
+    safe_chars = []
+    for c in group:
+        safe_chars.append(c if c.isalnum() or c in " ._-" else "_")
+    return "".join(safe_chars).strip() or "_"
+
+
+class SaveCompactor:
+    _saves_path: str
+    _archive_path: str
+    _pins_path: str
+
+    def __init__(self, saves_path: str):
+        self._saves_path = saves_path
+        self._archive_path = os.path.join(saves_path, ARCHIVE_DIR)
+        self._pins_path = os.path.join(self._archive_path, PINS_FILE)
+
+    # Compaction
+
+    def compact(self, keep: int) -> int:
+        # Returns how many saves were archived
+        groups: Dict[str, List] = {}
+        try:
+            entries = list(os.scandir(self._saves_path))
+        except OSError:
+            return 0
+
+        pins = self._read_manifest(self._pins_path)
+        kept_pins = {}
+        for entry in entries:
+            if not entry.is_file() or not entry.name.endswith(".ck3"):
+                continue
+            if pins.get(entry.name) == entry.stat().st_mtime:
+                # Restored by the user and not saved over since
+                kept_pins[entry.name] = pins[entry.name]
+                continue
+            save = SaveFile(entry.path)
+            if not save.valid() or not save.character_name():
+                # Autosaves and unreadable saves stay where they are
+                continue
+            groups.setdefault(save.group_identifier(), []).append(
+                (entry.stat().st_mtime, save)
+            )
+
+        archived = 0
+        for group, saves in groups.items():
+            saves.sort(key=lambda item: item[0], reverse=True)
+            old = saves[keep:]
+            if old:
+                archived += self._archive(group, [save for _, save in old])
+
+        if kept_pins != pins:
+            self._write_pins(kept_pins)
+        return archived
+
+    def _archive(self, group: str, saves: List[SaveFile]) -> int:
+        # Returns how many saves were moved into the archive
+        os.makedirs(self._archive_path, exist_ok=True)
+        base = os.path.join(self._archive_path, group_file_name(group))
+        manifest = self._read_manifest(base + ".json") or {
+            "group": group,
+            "saves": [],
+        }
+
+        written = []
+        with zipfile.ZipFile(
+            base + ".zip", "a", zipfile.ZIP_DEFLATED, strict_timestamps=False
+        ) as archive:
+            names = set(archive.namelist())
+            names.update(record["file"] for record in manifest["saves"])
+            for save in saves:
+                # A save name can come back after an older save with the
+                # same name was archived, both are kept
+                file_name = os.path.basename(save.path())
+                entry_name = self._unique_name(file_name, names)
+                stat = os.stat(save.path())
+                archive.write(save.path(), entry_name)
+                names.add(entry_name)
+
+                record = save.to_dict()
+                del record["path"]
+                record.update(
+                    {
+                        "file": entry_name,
+                        "original": file_name,
+                        "name": save.name(),
+                        "mtime": stat.st_mtime,
+                        "size": stat.st_size,
+                    }
+                )
+                manifest["saves"].append(record)
+                written.append(save)
+
+        # Originals only go once both the zip and the manifest are written,
+        # and only those that actually went into the zip
+        self._write_manifest(base + ".json", manifest)
+        for save in written:
+            os.remove(save.path())
+        return len(written)
+
+    # Archived Saves
+
+    def archived(self) -> List[Dict]:
+        records = []
+        try:
+            entries = sorted(
+                os.scandir(self._archive_path), key=lambda e: e.name
+            )
+        except OSError:
+            return records
+
+        for entry in entries:
+            if not entry.name.endswith(".json") or entry.name == PINS_FILE:
+                continue
+            manifest = self._read_manifest(entry.path)
+            if not manifest:
+                continue
+            archive_path = entry.path[:-5] + ".zip"
+            for record in manifest["saves"]:
+                # Listed again once the restored copy is gone
+                restored = record.get("restored")
+                if restored and os.path.exists(
+                    os.path.join(self._saves_path, restored)
+                ):
+                    continue
+                record = dict(record)
+                record["group"] = manifest["group"]
+                record["archive"] = archive_path
+                records.append(record)
+        return records
+
+    def restore(self, archive_path: str, file_name: str) -> str:
+        # Extracts one save back into the saves folder, returns the
+        # restored path. The zip isn't rewritten, the manifest only marks
+        # the save as restored. A save in the way is never overwritten,
+        # the restored one gets a new name instead.
+        manifest_path = archive_path[:-4] + ".json"
+        manifest = self._read_manifest(manifest_path)
+        record = None
+        if manifest:
+            for item in manifest["saves"]:
+                if item["file"] == file_name:
+                    record = item
+
+        original = record.get("original", file_name) if record else file_name
+        try:
+            taken = set(os.listdir(self._saves_path))
+        except OSError:
+            taken = set()
+        target = os.path.join(
+            self._saves_path, self._unique_name(original, taken)
+        )
+
+        with zipfile.ZipFile(archive_path) as archive:
+            with archive.open(file_name) as source, open(
+                target, "wb"
+            ) as destination:
+                shutil.copyfileobj(source, destination, 1024 * 1024)
+        if record:
+            os.utime(target, (record["mtime"], record["mtime"]))
+            record["restored"] = os.path.basename(target)
+            self._write_manifest(manifest_path, manifest)
+        pins = self._read_manifest(self._pins_path)
+        pins[os.path.basename(target)] = os.stat(target).st_mtime
+        self._write_pins(pins)
+        return target
+
+    # Internals
+
+    @staticmethod
+    def _unique_name(file_name: str, taken) -> str:
+        stem, extension = os.path.splitext(file_name)
+        name, counter = file_name, 1
+        while name in taken:
+            name = "{}_{}{}".format(stem, counter, extension)
+            counter += 1
+        return name
+
+    def _write_pins(self, pins: Dict):
+        os.makedirs(self._archive_path, exist_ok=True)
+        self._write_manifest(self._pins_path, pins)
+
+    @staticmethod
+    def _read_manifest(path: str) -> Dict:
+        data = read_json(path)
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def _write_manifest(path: str, manifest: Dict):
+        write_json(path, manifest, indent=2)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Archive old Crusader Kings III saves per character"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser("compact")
+    compact.add_argument("saves")
+    compact.add_argument("--keep", type=int, default=5)
+
+    listing = commands.add_parser("list")
+    listing.add_argument("saves")
+
+    restore = commands.add_parser("restore")
+    restore.add_argument("saves")
+    restore.add_argument("archive")
+    restore.add_argument("file")
+
+    args = parser.parse_args(argv)
+    compactor = SaveCompactor(args.saves)
+    if args.command == "compact":
+        print(compactor.compact(args.keep))
+    elif args.command == "list":
+        for record in compactor.archived():
+            print(json.dumps(record))
+    else:
+        print(compactor.restore(args.archive, args.file))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import mobase
+
+from typing import List
+
+from ..localization import localize_string
+from ..mod import ChecksumEngine
+
+
+class ModDataContent(mobase.ModDataContent):
+    # Flags mods in the mod list whose files change the game checksum,
+    # any of them active disables ironman and achievements
+
+    CHECKSUM: int = 0
+
+    def __init__(self):
+        super().__init__()
+
+    def getAllContents(self) -> List[mobase.ModDataContent.Content]:
+        return [
+            mobase.ModDataContent.Content(
+                self.CHECKSUM,
+                localize_string("Changes checksum (no achievements)"),
+                ":/MO/gui/content/script",
+            )
+        ]
+
+    def getContentsFor(self, tree: mobase.IFileTree) -> List[int]:
+        for entry in tree:
+            if (
+                entry.isDir()
+                and entry.name().casefold() in ChecksumEngine.CHECKSUM_DIRS
+                and self._hasFiles(entry)
+            ):
+                return [self.CHECKSUM]
+        return []
+
+    @staticmethod
+    def _hasFiles(tree: mobase.IFileTree) -> bool:
+        for entry in tree:
+            if entry.isFile() or ModDataContent._hasFiles(entry):
+                return True
+        return False
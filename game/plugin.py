@@ -1,37 +1,91 @@
 try:
-    from PyQt6.QtCore import QDir, QFileInfo, QStandardPaths
+    from PyQt6.QtCore import (
+        QDir,
+        QFileInfo,
+        QStandardPaths,
+        qCritical,
+        qDebug,
+    )
     from PyQt6.QtGui import QIcon
 except Exception:
-    from PyQt5.QtCore import QDir, QFileInfo, QStandardPaths
+    from PyQt5.QtCore import (
+        QDir,
+        QFileInfo,
+        QStandardPaths,
+        qCritical,
+        qDebug,
+    )
     from PyQt5.QtGui import QIcon
 
+import json
 import mobase
 import os
 
-from typing import Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 from basic_games.steam_utils import find_games as find_steam_games
 
+from ..instrumentation import Instrumentation
 from ..localization import localize_string
-from ..mod import ModDataChecker
-from .save import SaveGame
+from ..organizer import indexable_mods, plugin_data_path
+from ..mod import (
+    ChecksumEngine,
+    ConflictIndex,
+    Fingerprinter,
+    ModDataChecker,
+)
+from ..mod.locscan import LocalizationScanner
+from .compaction import SaveCompactor
+from .content import ModDataContent
+from .registry import ModRegistry
+from .save import ArchivedSaveGame, SaveGame
 
 
 class GamePlugin(mobase.IPluginGame):
     _gamePath: str
     _features: Dict
     _organizer: mobase.IOrganizer
+    _conflicts: ConflictIndex
+    _checksums: ChecksumEngine
+    _localization: LocalizationScanner
+    _workers: Dict[str, ThreadPoolExecutor]
+    _compaction: Optional[Future]
 
     def __init__(self):
         super().__init__()
         self._gamePath = ""
         self._features = {}
+        self._organizer = None
+        self._workers = {}
+        self._compaction = None
 
     # IPlugin Implementation
 
     def init(self, organizer: mobase.IOrganizer) -> bool:
         self._organizer = organizer
         self._features[mobase.ModDataChecker] = ModDataChecker()
+        self._features[mobase.ModDataContent] = ModDataContent()
+        organizer.onAboutToRun(self._onAboutToRun)
+        organizer.onFinishedRun(self._onFinishedRun)
+
+        self._conflicts = ConflictIndex(
+            plugin_data_path(organizer, "conflicts.json")
+        )
+        self._checksums = ChecksumEngine(
+            Fingerprinter(plugin_data_path(organizer, "fingerprints.json")),
+            plugin_data_path(organizer, "checksums.json"),
+        )
+        self._localization = LocalizationScanner(
+            plugin_data_path(organizer, "localization.json"), processes=False
+        )
+        organizer.onUserInterfaceInitialized(
+            self._onUserInterfaceInitialized
+        )
+        organizer.modList().onModInstalled(self._onModInstalled)
+        organizer.modList().onModRemoved(self._onModRemoved)
+        organizer.modList().onModMoved(self._onModMoved)
+        organizer.modList().onModStateChanged(self._onModStateChanged)
         return True
 
     def name(self) -> str:
@@ -55,7 +109,26 @@ class GamePlugin(mobase.IPluginGame):
         return self.name() == self._organizer.managedGame().name()
 
     def settings(self) -> List[mobase.PluginSetting]:
-        return []
+        return [
+            mobase.PluginSetting(
+                "save_compaction_keep",
+                localize_string(
+                    "Saves kept per character after playing, older ones are "
+                    "moved into an archive (0 to disable)"
+                ),
+                0,
+            ),
+            mobase.PluginSetting(
+                "instrumentation",
+                localize_string("Log timings of save listing"),
+                False,
+            ),
+            mobase.PluginSetting(
+                "instrumentation_memory",
+                localize_string("Also track memory use (slower)"),
+                False,
+            ),
+        ]
 
     # IPluginGame Implementation:
 
@@ -79,6 +152,17 @@ class GamePlugin(mobase.IPluginGame):
             self.setGamePath(steam_games[self.steamAPPId()])
             return
 
+    def workshopDirectory(self) -> QDir:
+        # <library>/steamapps/common/<game> -> <library>/steamapps/workshop
+        steamapps = QDir(self._gamePath)
+        steamapps.cdUp()
+        steamapps.cdUp()
+        return QDir(
+            steamapps.absoluteFilePath(
+                "workshop/content/{}".format(self.steamAPPId())
+            )
+        )
+
     def documentsDirectory(self) -> QDir:
         docs_path = QStandardPaths.writableLocation(
             QStandardPaths.DocumentsLocation
@@ -160,12 +244,31 @@ class GamePlugin(mobase.IPluginGame):
         return bool(self._gamePath)
 
     def listSaves(self, folder: QDir) -> List[mobase.ISaveGame]:
-        folder.setFilter(QDir.Files)
-        folder.setNameFilters(["*.ck3"])
-        return [
-            SaveGame(folder.absoluteFilePath(path))
-            for path in folder.entryList()
-        ]
+        instrumentation = self._instrumentation("listSaves")
+
+        with instrumentation.phase("list"):
+            folder.setFilter(QDir.Files)
+            folder.setNameFilters(["*.ck3"])
+            paths = folder.entryList()
+
+        with instrumentation.phase("parse"):
+            saves = [SaveGame(folder.absoluteFilePath(path)) for path in paths]
+
+        instrumentation.count("saves", len(saves))
+        instrumentation.count(
+            "bytes_read", sum(save.bytes_read() for save in saves)
+        )
+
+        # Archived saves come from the manifests, the zips stay closed
+        with instrumentation.phase("archived"):
+            archived = [
+                ArchivedSaveGame(record)
+                for record in SaveCompactor(folder.absolutePath()).archived()
+            ]
+        instrumentation.count("archived", len(archived))
+
+        instrumentation.finish()
+        return saves + archived
 
     def loadOrderMechanism(self) -> mobase.LoadOrderMechanism:
         return mobase.LoadOrderMechanism.PluginsTxt
@@ -203,3 +306,313 @@ class GamePlugin(mobase.IPluginGame):
 
     def validShortNames(self) -> List[str]:
         return []
+
+    # Plugin Data
+
+    def _worker(self, name: str) -> ThreadPoolExecutor:
+        # One thread per kind of background work, so jobs of a kind never
+        # run at the same time
+        if name not in self._workers:
+            self._workers[name] = ThreadPoolExecutor(1)
+        return self._workers[name]
+
+    def _instrumentation(self, operation: str) -> Instrumentation:
+        if not self._organizer:
+            return Instrumentation(operation)
+        return Instrumentation(
+            operation,
+            enabled=self._organizer.pluginSetting(
+                self.name(), "instrumentation"
+            ),
+            trace_memory=self._organizer.pluginSetting(
+                self.name(), "instrumentation_memory"
+            ),
+            log_path=plugin_data_path(
+                self._organizer, "instrumentation.jsonl"
+            ),
+        )
+
+    # Conflicts
+
+    # Like the checksums, the conflict index is only touched on its own
+    # worker thread. Checking every mod directory at startup takes a while.
+
+    def conflictIndex(self) -> ConflictIndex:
+        return self._conflicts
+
+    def _onUserInterfaceInitialized(self, window):
+        if not self.isActive():
+            return
+        mods = [
+            (mod.name(), mod.absolutePath(), self._replacePaths(mod))
+            for mod in indexable_mods(self._organizer)
+        ]
+        self._worker("conflicts").submit(
+            self._refreshConflicts, mods, self._activeNames()
+        )
+
+    def _refreshConflicts(self, mods: List, active: List[str]):
+        self._conflicts.load()
+        self._conflicts.set_active(active)
+        try:
+            if self._conflicts.refresh(mods):
+                self._conflicts.save()
+        except OSError as e:
+            qCritical("Failed to update conflicts: {}".format(e))
+
+    def _updateConflicts(
+        self,
+        name: str,
+        root: str,
+        replace_paths: Optional[List],
+        priorities: List[str],
+    ):
+        self._conflicts.set_mod(name, root, replace_paths=replace_paths)
+        # Installing in the middle of the list shifts every mod above it
+        self._conflicts.set_priorities(priorities)
+        try:
+            self._conflicts.save()
+        except OSError as e:
+            qCritical("Failed to update conflicts: {}".format(e))
+
+    def _removeConflicts(self, name: str):
+        self._conflicts.remove_mod(name)
+        try:
+            self._conflicts.save()
+        except OSError as e:
+            qCritical("Failed to update conflicts: {}".format(e))
+
+    def _activeNames(self) -> List[str]:
+        return [name for name, _ in self._activeMods()]
+
+    def _onModInstalled(self, mod: mobase.IModInterface):
+        if not self.isActive():
+            return
+        self._worker("conflicts").submit(
+            self._updateConflicts,
+            mod.name(),
+            mod.absolutePath(),
+            self._replacePaths(mod),
+            [mod.name() for mod in indexable_mods(self._organizer)],
+        )
+        self._worker("checksum").submit(
+            self._updateChecksum, mod.name(), mod.absolutePath()
+        )
+
+        mod_list = self._organizer.modList()
+        mods = [
+            (other.name(), other.absolutePath())
+            for other in indexable_mods(self._organizer)
+            if other.name() == mod.name()
+            or mod_list.state(other.name()) & mobase.ModState.ACTIVE
+        ]
+        self._worker("localization").submit(
+            self._reportLocalization, mod.name(), mods
+        )
+
+    def _replacePaths(self, mod: mobase.IModInterface) -> Optional[List]:
+        # The descriptor's replace_path lines, recorded by the installer
+        # and the Workshop importer since neither keeps descriptor.mod.
+        # None for mods they didn't add.
+        value = mod.pluginSetting(self.name(), "replace_paths", None)
+        if not value:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+
+    def _onModRemoved(self, name: str):
+        if not self.isActive():
+            return
+        self._worker("conflicts").submit(self._removeConflicts, name)
+        self._worker("checksum").submit(self._removeChecksum, name)
+
+    def _onModMoved(self, name: str, old_priority: int, new_priority: int):
+        if not self.isActive():
+            return
+        self._worker("conflicts").submit(
+            self._conflicts.set_priorities,
+            [mod.name() for mod in indexable_mods(self._organizer)],
+        )
+
+    def _onModStateChanged(self, states: Dict):
+        # Disabled mods stay indexed but no longer win conflicts
+        if not self.isActive():
+            return
+        self._worker("conflicts").submit(
+            self._conflicts.set_active, self._activeNames()
+        )
+
+    # Localization
+
+    def _reportLocalization(self, name: str, mods: List):
+        # Keys the new mod shares with the active mods, logged after each
+        # install. Only files changed since the last scan are parsed.
+        try:
+            self._localization.scan(mods)
+        except OSError as e:
+            qCritical("Failed to scan localization: {}".format(e))
+            return
+        records = self._localization.report(name)
+        if not records:
+            return
+        collisions = [r for r in records if r["type"] == "collision"]
+        overrides = [r for r in records if r["type"] == "override"]
+        qDebug(
+            "{}: {} localization keys collide with other mods, {} are "
+            "overridden through replace/".format(
+                name, len(collisions), len(overrides)
+            )
+        )
+        # The first few are enough to go on, the locscan CLI lists them all
+        for record in records[:20]:
+            qDebug(
+                "{} {} ({}): {}".format(
+                    record["type"],
+                    record["key"],
+                    record["language"],
+                    ", ".join(
+                        "{}:{}:{}".format(*location)
+                        for location in record["locations"]
+                    ),
+                )
+            )
+
+    # Checksum
+
+    # Hashing runs on one worker thread, which is also the only thread
+    # changing the ChecksumEngine. Lookups only read its cached digests.
+    # The mod list shows the same answer through ModDataContent.
+
+    def checksumAffectingMods(self) -> List[str]:
+        # Active mods that change the game checksum, any of them disables
+        # ironman and achievements. Answered from the digests cached at
+        # install and launch, no file is read.
+        return self._checksums.affecting_mods(self._activeNames())
+
+    def _activeMods(self) -> List:
+        mod_list = self._organizer.modList()
+        return [
+            (mod.name(), mod.absolutePath())
+            for mod in indexable_mods(self._organizer)
+            if mod_list.state(mod.name()) & mobase.ModState.ACTIVE
+        ]
+
+    def _refreshChecksums(self, mods: List):
+        # Catches files changed outside of MO2, reported again when that
+        # changed the answer
+        try:
+            updated = self._checksums.refresh(mods)
+            self._checksums.save()
+        except OSError as e:
+            qCritical("Failed to update checksums: {}".format(e))
+            return
+        if updated:
+            self._reportChecksum(
+                self._checksums.affecting_mods([name for name, _ in mods])
+            )
+
+    def _updateChecksum(self, name: str, root: str):
+        try:
+            self._checksums.update_mod(name, root)
+            self._checksums.save()
+        except OSError as e:
+            qCritical("Failed to update checksum of {}: {}".format(name, e))
+
+    def _removeChecksum(self, name: str):
+        self._checksums.remove_mod(name)
+        try:
+            self._checksums.save()
+        except OSError as e:
+            qCritical("Failed to update checksums: {}".format(e))
+
+    @staticmethod
+    def _reportChecksum(affecting: List[str]):
+        if affecting:
+            qDebug(
+                "Ironman and achievements are disabled by {} mods: {}".format(
+                    len(affecting), ", ".join(affecting)
+                )
+            )
+
+    # Save Compaction
+
+    def _localSavesPath(self) -> str:
+        profile = self._organizer.profile()
+        if profile.localSavesEnabled():
+            return os.path.join(profile.absolutePath(), "saves")
+        return self.savesDirectory().absolutePath()
+
+    def compactSaves(self, keep: int) -> int:
+        # Compactions run on one worker thread, restores only while none
+        # is running so they never touch an archive at the same time
+        return (
+            self._worker("saves")
+            .submit(self._compact, self._localSavesPath(), keep)
+            .result()
+        )
+
+    def archivedSaves(self) -> List[ArchivedSaveGame]:
+        return [
+            ArchivedSaveGame(record)
+            for record in SaveCompactor(self._localSavesPath()).archived()
+        ]
+
+    def restoreSave(self, save: ArchivedSaveGame) -> str:
+        # One save is extracted, quick enough for the GUI thread. "" while
+        # a compaction runs rather than waiting for it to parse every save.
+        if self._compaction and not self._compaction.done():
+            return ""
+        compactor = SaveCompactor(self._localSavesPath())
+        return compactor.restore(save.archive(), save.file())
+
+    @staticmethod
+    def _compact(saves_path: str, keep: int) -> int:
+        try:
+            return SaveCompactor(saves_path).compact(keep)
+        except (OSError, ValueError) as e:
+            qCritical("Failed to compact saves: {}".format(e))
+            return 0
+
+    def _onFinishedRun(self, path: str, exit_code: int):
+        if not self.isActive():
+            return
+        keep = self._organizer.pluginSetting(
+            self.name(), "save_compaction_keep"
+        )
+        if not keep or keep <= 0:
+            return
+        # Every save is parsed, keep that off the GUI thread
+        self._compaction = self._worker("saves").submit(
+            self._compact, self._localSavesPath(), keep
+        )
+
+    # Launch
+
+    def _onAboutToRun(self, path: str) -> bool:
+        if not self.isActive():
+            return True
+
+        mod_list = self._organizer.modList()
+        mods = [
+            (
+                mod.name(),
+                mod.absolutePath(),
+                mod.version().canonicalString(),
+            )
+            for mod in indexable_mods(self._organizer)
+            if mod_list.state(mod.name()) & mobase.ModState.ACTIVE
+        ]
+
+        registry = ModRegistry(self.documentsDirectory().absolutePath())
+        try:
+            registry.update(mods)
+        except OSError as e:
+            qCritical("Failed to update mod registry: {}".format(e))
+
+        self._reportChecksum(self.checksumAffectingMods())
+        self._worker("checksum").submit(
+            self._refreshChecksums, [(name, path) for name, path, _ in mods]
+        )
+        return True
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from typing import Dict, List, Tuple
+
+from ..jsonfile import read_json
+
+
+class ModRegistry:
+    PREFIX: str = "mo2_"
+
+    _documents_path: str
+    _mod_dir: str
+    _dlc_load_path: str
+
+    def __init__(self, documents_path: str):
+        self._documents_path = documents_path
+        self._mod_dir = os.path.join(documents_path, "mod")
+        self._dlc_load_path = os.path.join(documents_path, "dlc_load.json")
+
+    # Public
+
+    def update(self, mods: List[Tuple[str, str, str]]) -> Tuple[int, int]:
+        # mods is (name, path, version) in load order
+        # Returns (files written, files removed)
+        os.makedirs(self._mod_dir, exist_ok=True)
+
+        wanted: Dict[str, str] = {}
+        for name, path, version in mods:
+            file_name = self.file_name(name)
+            wanted[file_name] = self.render(name, path, version)
+
+        written = 0
+        for file_name, content in wanted.items():
+            if self._write_if_changed(
+                os.path.join(self._mod_dir, file_name), content
+            ):
+                written += 1
+
+        removed = 0
+        for file_name in os.listdir(self._mod_dir):
+            if not file_name.startswith(self.PREFIX):
+                continue
+            if not file_name.endswith(".mod"):
+                continue
+            if file_name not in wanted:
+                os.remove(os.path.join(self._mod_dir, file_name))
+                removed += 1
+
+        enabled = ["mod/{}".format(file_name) for file_name in wanted]
+        if self._write_if_changed(
+            self._dlc_load_path, self._render_dlc_load(enabled)
+        ):
+            written += 1
+
+        return written, removed
+
+    # Rendering
+
+    @staticmethod
+    def file_name(name: str) -> str:
+        # The hash keeps names that only differ in punctuation or case
+        # ("My Mod", "my-mod") apart
+        safe_chars = []
+        for c in name.casefold():
+            safe_chars.append(c if c.isalnum() else "_")
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        return "{}{}_{}.mod".format(
+            ModRegistry.PREFIX, "".join(safe_chars), digest
+        )
+
+    @staticmethod
+    def render(name: str, path: str, version: str) -> str:
+        lines = [
+            'name="{}"'.format(name.replace('"', "'")),
+            'path="{}"'.format(path.replace("\\", "/")),
+        ]
+        if version:
+            lines.append('version="{}"'.format(version))
+        return "\n".join(lines) + "\n"
+
+    def _render_dlc_load(self, enabled: List[str]) -> str:
+        # Keep whatever the launcher put in here, only own the mo2_
+        # entries of enabled_mods. Launcher mods load before MO2's.
+        data = read_json(self._dlc_load_path)
+        if not isinstance(data, dict):
+            data = {}
+
+        enabled_mods = data.get("enabled_mods")
+        if not isinstance(enabled_mods, list):
+            enabled_mods = []
+        others = [
+            entry
+            for entry in enabled_mods
+            if isinstance(entry, str)
+            and not entry.replace("\\", "/").startswith(
+                "mod/" + self.PREFIX
+            )
+        ]
+        data["enabled_mods"] = others + enabled
+        data.setdefault("disabled_dlcs", [])
+        return json.dumps(data, indent=4) + "\n"
+
+    # Writing
+
+    @staticmethod
+    def _write_if_changed(path: str, content: str) -> bool:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == content:
+                    return False
+        except (OSError, UnicodeDecodeError):
+            pass
+
+        directory = os.path.dirname(path)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return True
@@ -5,26 +5,20 @@ except Exception:
 
 import mobase
 import os
-import re
 
-from typing import List
+from typing import Dict, List
 
+from .savefile import SaveFile
 
-class SaveGame(mobase.ISaveGame):
-    _path: str
-    _valid: bool
-    _basic_name: str = ""
-    _use_basic_name: bool = True
 
-    _id: str = ""
-    _character_name: str = ""
-    _character_title: str = ""
-    _game_date: str = ""
+class SaveGame(mobase.ISaveGame):
+    _file: SaveFile
 
     def __init__(self, path: str):
         super().__init__()
-        self._path = path
-        self._valid = self._read()
+        self._file = SaveFile(path)
+        for error in self._file.errors():
+            qCritical(error)
 
     def allFiles(self) -> List[str]:
         return [self.getFilepath()]
@@ -34,93 +28,61 @@ class SaveGame(mobase.ISaveGame):
         return QDateTime.fromSecsSinceEpoch(ts)
 
     def getFilepath(self) -> str:
-        return self._path
+        return self._file.path()
 
     def getName(self) -> str:
-        return (
-            self._basic_name
-            if self._use_basic_name
-            else "{}, {} [{}]".format(
-                self.character_name(), self.character_title(), self.game_date()
-            )
-        )
+        return self._file.name()
 
     def getSaveGroupIdentifier(self) -> str:
-        return "{}, {}".format(self.character_name(), self.character_title())
+        return self._file.group_identifier()
 
     def valid(self) -> bool:
-        return self._valid
+        return self._file.valid()
 
     def character_name(self) -> str:
-        return self._character_name
+        return self._file.character_name()
 
     def character_title(self) -> str:
-        return self._character_title
+        return self._file.character_title()
 
     def game_date(self) -> str:
-        return self._game_date
-
-    def _read(self) -> bool:
-        file_name = os.path.basename(self._path)
-        save_name = os.path.splitext(file_name)[0]
-        self._basic_name = save_name
-
-        if save_name.startswith("autosave"):
-            return True
-
-        meta_content = ""
-        with open(
-            self._path, "rt", encoding="utf-8", errors="ignore"
-        ) as save_file:
-            line_num = 0
-            depth = 0
-            line = ""
-            in_meta = False
-
-            while True:
-                line_num += 1
-                try:
-                    line = save_file.readline().strip()
-                except Exception:
-                    qCritical("Error reading line {}".format(line_num))
-                    break
-
-                if line_num == 1:
-                    self._id = line
-                    if not self._id.startswith("SAV"):
-                        qCritical("Invalid Save ID: {}".format(self._id))
-                        return False
-
-                if not in_meta:
-                    if "meta_data={" in line:
-                        in_meta = True
-                        depth = 0
-                    continue
-
-                depth += line.count("{")
-                depth -= line.count("}")
-                if depth < 0:
-                    break
-
-                meta_content += "\n{}".format(line)
-
-            match = re.search(r"meta_player_name=\"(.+)\"", meta_content)
-            if not match:
-                qCritical("No character name found")
-                return False
-            self._character_name = match.group(1)
-
-            match = re.search(r"meta_title_name=\"(.+)\"", meta_content)
-            if not match:
-                qCritical("No character title found")
-                return False
-            self._character_title = match.group(1)
-
-            match = re.search(r"meta_date=(.+)", meta_content)
-            if not match:
-                qCritical("No game date found")
-                return False
-            self._game_date = match.group(1)
-
-        self._use_basic_name = False
+        return self._file.game_date()
+
+    def bytes_read(self) -> int:
+        return self._file.bytes_read()
+
+
+class ArchivedSaveGame(mobase.ISaveGame):
+    # A save moved into a group archive by SaveCompactor, described by its
+    # manifest record. Restoring it is up to SaveCompactor.restore.
+
+    _record: Dict
+
+    def __init__(self, record: Dict):
+        super().__init__()
+        self._record = record
+
+    def allFiles(self) -> List[str]:
+        # Nothing for MO2 to move or delete, the save lives in the zip
+        return []
+
+    def getCreationTime(self) -> QDateTime:
+        return QDateTime.fromSecsSinceEpoch(int(self._record["mtime"]))
+
+    def getFilepath(self) -> str:
+        return "{}/{}".format(self.archive(), self.file())
+
+    def getName(self) -> str:
+        return "{} (archived)".format(self._record["name"])
+
+    def getSaveGroupIdentifier(self) -> str:
+        return self._record["group"]
+
+    def valid(self) -> bool:
         return True
+
+    def archive(self) -> str:
+        return self._record["archive"]
+
+    def file(self) -> str:
+        return self._record["file"]
@@ -0,0 +1,150 @@
+import os
+import re
+
+from typing import Dict, List
+
+# Save metadata parsing without Qt or mobase, shared by SaveGame and the
+# headless save index
+
+
+class SaveFile:
+    _path: str
+    _valid: bool
+    _errors: List[str]
+    _basic_name: str = ""
+    _use_basic_name: bool = True
+
+    _id: str = ""
+    _character_name: str = ""
+    _character_title: str = ""
+    _game_date: str = ""
+
+    _bytes_read: int = 0
+
+    def __init__(self, path: str):
+        self._path = path
+        self._errors = []
+        self._valid = self._read()
+
+    def path(self) -> str:
+        return self._path
+
+    def valid(self) -> bool:
+        return self._valid
+
+    def errors(self) -> List[str]:
+        return self._errors
+
+    def name(self) -> str:
+        return (
+            self._basic_name
+            if self._use_basic_name
+            else "{}, {} [{}]".format(
+                self.character_name(), self.character_title(), self.game_date()
+            )
+        )
+
+    def group_identifier(self) -> str:
+        return "{}, {}".format(self.character_name(), self.character_title())
+
+    def save_id(self) -> str:
+        return self._id
+
+    def character_name(self) -> str:
+        return self._character_name
+
+    def character_title(self) -> str:
+        return self._character_title
+
+    def game_date(self) -> str:
+        return self._game_date
+
+    def bytes_read(self) -> int:
+        return self._bytes_read
+
+    def to_dict(self) -> Dict:
+        return {
+            "path": self._path,
+            "id": self._id,
+            "character": self._character_name,
+            "title": self._character_title,
+            "date": self._game_date,
+            "valid": self._valid,
+        }
+
+    def _read(self) -> bool:
+        file_name = os.path.basename(self._path)
+        save_name = os.path.splitext(file_name)[0]
+        self._basic_name = save_name
+
+        if save_name.startswith("autosave"):
+            return True
+
+        meta_content = ""
+        with open(
+            self._path, "rt", encoding="utf-8", errors="ignore"
+        ) as save_file:
+            line_num = 0
+            depth = 0
+            line = ""
+            in_meta = False
+
+            while True:
+                line_num += 1
+                try:
+                    line = save_file.readline()
+                except Exception:
+                    self._errors.append(
+                        "Error reading line {}".format(line_num)
+                    )
+                    break
+
+                # End of file, no (complete) meta_data block
+                if not line:
+                    break
+                # Bytes taken from the file, decoded characters undercount
+                # non-ASCII names and binary data
+                self._bytes_read = save_file.buffer.tell()
+                line = line.strip()
+
+                if line_num == 1:
+                    self._id = line
+                    if not self._id.startswith("SAV"):
+                        self._errors.append(
+                            "Invalid Save ID: {}".format(self._id)
+                        )
+                        return False
+
+                if not in_meta:
+                    if "meta_data={" in line:
+                        in_meta = True
+                        depth = 0
+                    continue
+
+                depth += line.count("{")
+                depth -= line.count("}")
+                if depth < 0:
+                    break
+
+                meta_content += "\n{}".format(line)
+
+            match = re.search(r"meta_player_name=\"(.+)\"", meta_content)
+            if not match:
+                self._errors.append("No character name found")
+                return False
+            self._character_name = match.group(1)
+
+            match = re.search(r"meta_title_name=\"(.+)\"", meta_content)
+            if not match:
+                self._errors.append("No character title found")
+                return False
+            self._character_title = match.group(1)
+
+            match = re.search(r"meta_date=(.+)", meta_content)
+            if not match:
+                self._errors.append("No game date found")
+                return False
+            self._game_date = match.group(1)
+
+        self._use_basic_name = False
+        return True
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from ..jsonfile import read_cache, write_cache
+from .savefile import SaveFile
+
+# Headless save index, run from the folder containing the plugin:
+#   python -m <plugin folder>.game.saveindex <saves folder> --cache index.json
+# Prints one JSON line per save. Saves already in the cache with the same
+# size and mtime are not parsed again.
+
+CACHE_VERSION: int = 1
+
+
+def parse(path: str) -> Dict:
+    try:
+        return SaveFile(path).to_dict()
+    except OSError as e:
+        return {"path": path, "valid": False, "error": str(e)}
+
+
+def find_saves(root: str) -> List[Tuple[str, int, int]]:
+    saves = []
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in sorted(file_names):
+            if not file_name.casefold().endswith(".ck3"):
+                continue
+            path = os.path.join(dir_path, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            saves.append((path, stat.st_size, stat.st_mtime_ns))
+    return saves
+
+
+def load_cache(cache_path: str) -> Dict[str, Dict]:
+    return read_cache(cache_path, CACHE_VERSION, "saves") or {}
+
+
+def save_cache(cache_path: str, saves: Dict[str, Dict]):
+    write_cache(cache_path, CACHE_VERSION, "saves", saves)
+
+
+def index(
+    roots: List[str], cache_path: str = "", workers: int = None, out=None
+) -> Tuple[int, int]:
+    # Returns (saves indexed, saves parsed)
+    out = out or sys.stdout
+    cache = load_cache(cache_path)
+    saves = [save for root in roots for save in find_saves(root)]
+
+    updated: Dict[str, Dict] = {}
+    stale = []
+    for path, size, mtime in saves:
+        entry = cache.get(path)
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            updated[path] = entry
+            out.write(json.dumps(entry["record"]) + "\n")
+        else:
+            stale.append((path, size, mtime))
+
+    if stale:
+        with ProcessPoolExecutor(workers) as executor:
+            records = executor.map(
+                parse, [path for path, _, _ in stale], chunksize=8
+            )
+            for (path, size, mtime), record in zip(stale, records):
+                updated[path] = {
+                    "size": size,
+                    "mtime": mtime,
+                    "record": record,
+                }
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+    save_cache(cache_path, updated)
+    return len(saves), len(stale)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Index Crusader Kings III saves as JSON lines"
+    )
+    parser.add_argument("roots", nargs="+", help="folders to scan for saves")
+    parser.add_argument(
+        "--cache", default="", help="index kept between runs"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    total, parsed = index(args.roots, args.cache, args.workers)
+    print(
+        json.dumps({"summary": {"saves": total, "parsed": parsed}}),
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
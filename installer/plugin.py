@@ -1,31 +1,54 @@
 try:
-    from PyQt6.QtCore import qCritical
+    from PyQt6.QtCore import QThread, qCritical, qDebug
     from PyQt6.QtWidgets import QDialog
 except Exception:
-    from PyQt5.QtCore import qCritical
+    from PyQt5.QtCore import QThread, qCritical, qDebug
     from PyQt5.QtWidgets import QDialog
 
+import json
 import mobase
+import os
+import time
 
 from typing import Dict, List, Union
 
-from ..mod import Descriptor, TreeHelper
+from ..mod import (
+    ExclusionFilter,
+    InstallManifest,
+    ModIndex,
+    TreeHelper,
+    clean_mod_name,
+)
+from ..instrumentation import Instrumentation
 from ..localization import localize_string
+from ..organizer import indexable_mods, plugin_data_path
 
 from .ui import Dialog
+from .worker import AnalysisWorker, ArchiveExtractor
 
 
 class ArchiveInstaller(mobase.IPluginInstallerSimple):
     _organizer: mobase.IOrganizer
     _post_install_data: Dict
+    _archive_path: str = ""
+    _mod_index: ModIndex
+    _analyses: List
 
     def __init__(self):
         super().__init__()
+        self._analyses = []
 
     # IPlugin Implementation
 
     def init(self, organizer: mobase.IOrganizer) -> bool:
         self._organizer = organizer
+        self._mod_index = ModIndex(
+            plugin_data_path(organizer, "modindex.json")
+        )
+        organizer.onUserInterfaceInitialized(
+            self._onUserInterfaceInitialized
+        )
+        organizer.modList().onModRemoved(self._onModRemoved)
         return True
 
     def name(self) -> str:
@@ -52,7 +75,35 @@ class ArchiveInstaller(mobase.IPluginInstallerSimple):
         return [
             mobase.PluginSetting(
                 "enabled", localize_string("Check to enable this plugin"), True
-            )
+            ),
+            mobase.PluginSetting(
+                "exclude_patterns",
+                localize_string(
+                    "Comma separated patterns of files and folders to leave "
+                    "out of installed mods"
+                ),
+                ", ".join(ExclusionFilter.DEFAULT_PATTERNS),
+            ),
+            mobase.PluginSetting(
+                "delta_updates",
+                localize_string(
+                    "Only write files that changed when updating a mod "
+                    "(Merge is fastest, other choices extract the skipped "
+                    "files afterwards). Listing .7z and .rar archives needs "
+                    "7z on PATH, without it they are installed in full"
+                ),
+                False,
+            ),
+            mobase.PluginSetting(
+                "instrumentation",
+                localize_string("Log timings of each installation phase"),
+                False,
+            ),
+            mobase.PluginSetting(
+                "instrumentation_memory",
+                localize_string("Also track memory use (slower)"),
+                False,
+            ),
         ]
 
     # IPluginInstaller Implementation
@@ -66,6 +117,13 @@ class ArchiveInstaller(mobase.IPluginInstallerSimple):
     def priority(self) -> int:
         return 50
 
+    def onInstallationStart(self, archive, reinstallation, current_mod):
+        self._archive_path = archive
+        self._post_install_data = {}
+        # Picks up Workshop imports and renames since the last install
+        if self.isActive():
+            self._refreshModIndex()
+
     def onInstallationEnd(self, result, mod):
         if result == mobase.InstallResult.SUCCESS:
             # Set version
@@ -82,6 +140,28 @@ class ArchiveInstaller(mobase.IPluginInstallerSimple):
                 for category in categories:
                     mod.addCategory(category)
 
+            # descriptor.mod isn't installed, keep its replace_path lines
+            # for the game plugin's conflict index
+            replace_paths = self._post_install_data.get("replace_paths")
+            if replace_paths is not None:
+                mod.setPluginSetting(
+                    self._organizer.managedGame().name(),
+                    "replace_paths",
+                    json.dumps(replace_paths),
+                )
+
+            # Finish delta update, record files for the next one
+            self._finishDelta(mod)
+
+            # Remember what was installed for the next update
+            self._mod_index.set_mod(
+                mod.name(),
+                self._post_install_data.get("remote_file_id", ""),
+                self._post_install_data.get("descriptor_name", ""),
+                ModIndex.digest(self._post_install_data.get("files")),
+            )
+            self._mod_index.save()
+
     # IPluginInstallerSimple Implementation
 
     def install(
@@ -91,59 +171,292 @@ class ArchiveInstaller(mobase.IPluginInstallerSimple):
         version: str,
         modId: int,
     ) -> Union[mobase.InstallResult, mobase.IFileTree]:
-        install_tree = TreeHelper.to_installable(tree)
-        if not install_tree:
-            qCritical("Install Failed: to_installable returned None")
-            return mobase.InstallResult.FAILED
-
-        descriptor_entry = TreeHelper.find_descriptor(install_tree)
-        descriptor_path = self._manager().extractFile(descriptor_entry)
-        descriptor = Descriptor(descriptor_path)
-
-        thumbnail_entry = TreeHelper.find_thumbnail(install_tree)
-        thumbnail_path = (
-            self._manager().extractFile(thumbnail_entry)
-            if thumbnail_entry
-            else ""
+        instrumentation = self._instrumentation("install")
+        TreeHelper.counting = instrumentation.enabled()
+        visited = TreeHelper.visited
+
+        try:
+            result = self._install(guessed_name, tree, instrumentation)
+        finally:
+            TreeHelper.counting = False
+
+        instrumentation.count("entries_visited", TreeHelper.visited - visited)
+        instrumentation.finish(
+            result=(
+                str(result)
+                if isinstance(result, mobase.InstallResult)
+                else "tree"
+            )
         )
+        return result
 
-        names = [descriptor.name()]
+    def _install(
+        self,
+        guessed_name: mobase.GuessedString,
+        tree: mobase.IFileTree,
+        instrumentation: Instrumentation,
+    ) -> Union[mobase.InstallResult, mobase.IFileTree]:
+        # The dialog opens straight away and fills in as the worker reads
+        # the archive in the background. Extractions go through MO2, so
+        # they run here on the GUI thread once the worker is done.
+        names = []
         for variant in guessed_name.variants():
             if variant not in names:
                 names.append(variant)
-
         dialog = Dialog(
-            self._parentWidget(),
-            names=names,
-            image_path=thumbnail_path,
-            categories=descriptor.tags(),
-            version=descriptor.version(),
-            supported_version=descriptor.supported_version(),
+            self._parentWidget(), names=names, instrumentation=instrumentation
         )
+        dialog.setLoading()
 
-        if dialog.exec_() != QDialog.Accepted:
+        exclusions = ExclusionFilter.from_setting(
+            self._organizer.pluginSetting(self.name(), "exclude_patterns")
+        )
+
+        thread = QThread()
+        worker = AnalysisWorker(
+            tree, instrumentation, exclusions, self._archive_path
+        )
+        worker.moveToThread(thread)
+        extractor = ArchiveExtractor(
+            self._manager(),
+            worker,
+            instrumentation,
+            self._mod_index,
+            self._organizer.modList(),
+        )
+        worker.progress.connect(dialog.setProgress)
+        worker.failed.connect(dialog.setFailed)
+        worker.analysed.connect(extractor.run)
+        worker.finished.connect(thread.quit)
+        extractor.progress.connect(dialog.setProgress)
+        extractor.detailsReady.connect(dialog.setDetails)
+        extractor.matchReady.connect(dialog.setMatch)
+        extractor.thumbnailReady.connect(dialog.setImage)
+        extractor.failed.connect(dialog.setFailed)
+        extractor.ready.connect(dialog.setReady)
+        thread.started.connect(worker.run)
+        thread.start()
+
+        # Split into waiting for the analysis and waiting for the user
+        opened = time.perf_counter()
+        accepted = dialog.exec_() == QDialog.Accepted
+        closed = time.perf_counter()
+        ready = dialog.readyTime() or closed
+        instrumentation.add_phase("dialog_loading", ready - opened)
+        instrumentation.add_phase("dialog_user", closed - ready)
+
+        error = worker.error or extractor.error
+        if error:
+            qCritical("Install Failed: {}".format(error))
+
+        if not accepted:
+            # The worker stops at its next step
+            worker.cancel()
+            extractor.cancel()
             if dialog.manual():
+                # The manual installer gets the same tree, the worker must
+                # be done walking it first
+                thread.quit()
+                thread.wait()
                 return mobase.InstallResult.MANUAL_REQUESTED
+            self._keepUntilFinished(thread, worker)
+            if error:
+                return mobase.InstallResult.FAILED
             return mobase.InstallResult.CANCELED
+        thread.wait()
+
+        descriptor = extractor.descriptor
+        install_tree = worker.install_tree
 
         self._post_install_data = {
             "categories": descriptor.tags(),
             "version": descriptor.version(),
+            "remote_file_id": descriptor.remote_file_id(),
+            "descriptor_name": descriptor.name(),
+            "replace_paths": descriptor.replace_paths(),
         }
+        if extractor.match:
+            qDebug(
+                "{} looks like an update of {}".format(
+                    descriptor.name(), extractor.match
+                )
+            )
 
         guessed_name.update(self._cleanName(dialog.name()))
 
-        final_tree = TreeHelper.to_final(install_tree)
+        with instrumentation.phase("to_final"):
+            final_tree = TreeHelper.to_final(install_tree, exclusions)
         if not final_tree:
             qCritical("Install Failed: to_final returned None")
             return mobase.InstallResult.FAILED
 
+        # Sizes come from the archive listing, unknown when it failed
+        excluded_bytes = worker.excluded_bytes
+        if exclusions.excluded_entries():
+            qDebug(
+                "Excluded {} files{} from {}".format(
+                    exclusions.excluded_entries(),
+                    (
+                        ""
+                        if excluded_bytes is None
+                        else " ({} bytes)".format(excluded_bytes)
+                    ),
+                    dialog.name(),
+                )
+            )
+        instrumentation.count(
+            "excluded_entries", exclusions.excluded_entries()
+        )
+        if excluded_bytes is not None:
+            instrumentation.count("excluded_bytes", excluded_bytes)
+
+        with instrumentation.phase("delta"):
+            self._prepareDelta(
+                final_tree,
+                self._cleanName(dialog.name()),
+                worker.files,
+                instrumentation,
+            )
+
         return final_tree
 
+    def _keepUntilFinished(self, thread: QThread, worker: AnalysisWorker):
+        # A cancelled analysis may still be running, its thread must not be
+        # destroyed before it ends
+        self._analyses = [
+            analysis
+            for analysis in self._analyses
+            if not analysis[0].isFinished()
+        ]
+        if not thread.isFinished():
+            self._analyses.append((thread, worker))
+
+    # Delta Updates
+
+    def _manifestPath(self, mod_name: str) -> str:
+        return plugin_data_path(
+            self._organizer, os.path.join("manifests", mod_name + ".json")
+        )
+
+    def _prepareDelta(
+        self,
+        final_tree: mobase.IFileTree,
+        mod_name: str,
+        files: Dict,
+        instrumentation: Instrumentation,
+    ):
+        # files is the archive listing from the worker
+        if files is not None:
+            self._post_install_data["files"] = files
+
+        if not self._organizer.pluginSetting(self.name(), "delta_updates"):
+            return
+        if not self._organizer.modList().getMod(mod_name):
+            return
+        if files is None:
+            qCritical(
+                "Delta update of {} skipped, the archive could not be "
+                "listed (.7z and .rar archives need 7z on PATH)".format(
+                    mod_name
+                )
+            )
+            return
+        old_files = InstallManifest(self._manifestPath(mod_name)).files()
+        if not old_files:
+            return
+
+        changed, unchanged, removed = InstallManifest.diff(old_files, files)
+        InstallManifest.detach_files(final_tree, unchanged)
+        self._post_install_data["unchanged"] = unchanged
+        self._post_install_data["removed"] = removed
+
+        qDebug(
+            "Delta update of {}: {} changed, {} unchanged, {} removed".format(
+                mod_name, len(changed), len(unchanged), len(removed)
+            )
+        )
+        instrumentation.count("delta_changed", len(changed))
+        instrumentation.count("delta_unchanged", len(unchanged))
+        instrumentation.count("delta_removed", len(removed))
+
+    def _finishDelta(self, mod: mobase.IModInterface):
+        files = self._post_install_data.get("files")
+        if files is None:
+            return
+        manifest = InstallManifest(self._manifestPath(mod.name()))
+        root = mod.absolutePath()
+
+        # Replace or Rename instead of Merge leaves out the files the
+        # update skipped, they are extracted from the archive after all
+        unchanged = self._post_install_data.get("unchanged", {})
+        try:
+            restored = InstallManifest.restore_files(
+                root, unchanged, self._archive_path
+            )
+        except Exception as e:
+            qCritical(
+                "Delta update of {} is missing unchanged files and they "
+                "could not be extracted ({}), reinstall it with delta "
+                "updates disabled".format(mod.name(), e)
+            )
+            manifest.remove()
+            return
+        if restored:
+            qDebug(
+                "Delta update of {} was not merged, extracted {} unchanged "
+                "files".format(mod.name(), restored)
+            )
+
+        InstallManifest.remove_files(
+            root, self._post_install_data.get("removed", {})
+        )
+
+        manifest.set_files(files)
+        manifest.save()
+
+    def _instrumentation(self, operation: str) -> Instrumentation:
+        return Instrumentation(
+            operation,
+            enabled=self._organizer.pluginSetting(
+                self.name(), "instrumentation"
+            ),
+            trace_memory=self._organizer.pluginSetting(
+                self.name(), "instrumentation_memory"
+            ),
+            log_path=plugin_data_path(
+                self._organizer, "instrumentation.jsonl"
+            ),
+        )
+
+    # Installed Mod Index
+
+    def _onUserInterfaceInitialized(self, window):
+        # Built once, then kept up to date by installs and removals
+        if not self.isActive():
+            return
+        self._mod_index.load()
+        self._refreshModIndex()
+
+    def _refreshModIndex(self):
+        # Only mods the index doesn't know yet are read
+        game_name = self._organizer.managedGame().name()
+        mods = [
+            (
+                mod.name(),
+                mod.absolutePath(),
+                mod.pluginSetting(game_name, "remote_file_id", ""),
+                mod.pluginSetting(game_name, "descriptor_name", ""),
+            )
+            for mod in indexable_mods(self._organizer)
+        ]
+        if self._mod_index.refresh(mods):
+            self._mod_index.save()
+
+    def _onModRemoved(self, name: str):
+        if not self.isActive():
+            return
+        self._mod_index.remove_mod(name)
+        self._mod_index.save()
+
     def _cleanName(self, name: str) -> str:
-        safe_chars = [" ", ".", "_"]
-        name_chars = []
-        for c in name:
-            safe_c = c if c in safe_chars or c.isalnum() else "_"
-            name_chars.append(safe_c)
-        return "".join(name_chars).rstrip()
+        return clean_mod_name(name)
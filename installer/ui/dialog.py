@@ -1,20 +1,29 @@
 try:
-    from PyQt6.QtCore import Qt
+    from PyQt6.QtCore import Qt, pyqtSlot
     from PyQt6.QtGui import QPixmap
-    from PyQt6.QtWidgets import QDialog, QWidget
+    from PyQt6.QtWidgets import QDialog, QProgressBar, QWidget
 except Exception:
-    from PyQt5.QtCore import Qt
+    from PyQt5.QtCore import Qt, pyqtSlot
     from PyQt5.QtGui import QPixmap
-    from PyQt5.QtWidgets import QDialog, QWidget
+    from PyQt5.QtWidgets import QDialog, QProgressBar, QWidget
+
+import time
 
 from typing import List
 
+from ...instrumentation import Instrumentation
+from ...localization import localize_string
 from .ui_dialog import Ui_Dialog
 
 
 class Dialog(QDialog):
     _ui: object
     _manual: bool = False
+    _progress: QProgressBar
+    _guessed_name: str = ""
+    _has_image: bool = False
+    _ready_time: float = 0.0
+    _instrumentation: Instrumentation
 
     def __init__(
         self,
@@ -24,23 +33,23 @@ class Dialog(QDialog):
         categories: List[str] = [],
         version: str = "",
         supported_version: str = "",
+        instrumentation: Instrumentation = None,
     ):
         super().__init__(parent)
+        self._instrumentation = instrumentation or Instrumentation("dialog")
 
         self._ui = Ui_Dialog()
         self._ui.setupUi(self)
 
+        self._progress = QProgressBar(self)
+        self._progress.setVisible(False)
+        self._ui.verticalLayout_Main.insertWidget(1, self._progress)
+
         if image_path != "":
-            image_container = self._ui.label_Image
-            image = QPixmap(image_path)
-            image = image.scaled(
-                image_container.width(),
-                image_container.height(),
-                Qt.KeepAspectRatio,
-            )
-            image_container.setPixmap(image)
+            self.setImage(image_path)
 
         self._ui.nameComboBox.addItems(names)
+        self._guessed_name = self.name()
 
         self._ui.versionLineEdit.setText(version)
         self._ui.supportedVersionLineEdit.setText(supported_version)
@@ -67,3 +76,99 @@ class Dialog(QDialog):
 
     def name(self) -> str:
         return self._ui.nameComboBox.currentText()
+
+    def readyTime(self) -> float:
+        # time.perf_counter() when the analysis finished, 0 before
+        return self._ready_time
+
+    # Asynchronous Updates
+
+    def setLoading(self):
+        loading = localize_string("Loading...")
+        self._ui.versionLineEdit.setPlaceholderText(loading)
+        self._ui.supportedVersionLineEdit.setPlaceholderText(loading)
+        self._ui.label_Image.setText(loading)
+        self._ui.pushButton_OK.setEnabled(False)
+        self._progress.setRange(0, 100)
+        self._progress.setValue(0)
+        self._progress.setVisible(True)
+
+    @pyqtSlot(int, str)
+    def setProgress(self, value: int, message: str):
+        self._progress.setValue(value)
+        self._progress.setFormat(
+            "{} %p%".format(message) if message else "%p%"
+        )
+
+    @pyqtSlot(str, list, str, str)
+    def setDetails(
+        self,
+        name: str,
+        categories: List[str],
+        version: str,
+        supported_version: str,
+    ):
+        # The descriptor name goes first, and is selected unless the user
+        # already changed the name
+        combo_box = self._ui.nameComboBox
+        unchanged = self.name() == self._guessed_name
+        if name:
+            index = combo_box.findText(name)
+            if index >= 0:
+                combo_box.removeItem(index)
+            combo_box.insertItem(0, name)
+            if unchanged:
+                combo_box.setCurrentIndex(0)
+                self._guessed_name = name
+
+        self._ui.versionLineEdit.setText(version)
+        self._ui.supportedVersionLineEdit.setText(supported_version)
+        self._ui.listWidget_Categories.clear()
+        self._ui.listWidget_Categories.addItems(categories)
+
+    @pyqtSlot(str)
+    def setMatch(self, mod_name: str):
+        # An installed mod this archive updates, preselected the same way
+        # as the descriptor name
+        combo_box = self._ui.nameComboBox
+        unchanged = self.name() == self._guessed_name
+        index = combo_box.findText(mod_name)
+        if index >= 0:
+            combo_box.removeItem(index)
+        combo_box.insertItem(0, mod_name)
+        if unchanged:
+            combo_box.setCurrentIndex(0)
+            self._guessed_name = mod_name
+
+    @pyqtSlot(str)
+    def setImage(self, image_path: str):
+        image_container = self._ui.label_Image
+        with self._instrumentation.phase("thumbnail_load"):
+            image = QPixmap(image_path)
+            image = image.scaled(
+                image_container.width(),
+                image_container.height(),
+                Qt.KeepAspectRatio,
+            )
+            image_container.setPixmap(image)
+        self._has_image = True
+
+    @pyqtSlot(str)
+    def setFailed(self, message: str):
+        self._progress.setVisible(False)
+        self._ui.label_Image.setText(
+            localize_string("Analysis failed: {}").format(message)
+        )
+        self._ui.versionLineEdit.setPlaceholderText("")
+        self._ui.supportedVersionLineEdit.setPlaceholderText("")
+        self._ui.pushButton_OK.setEnabled(False)
+
+    @pyqtSlot()
+    def setReady(self):
+        self._ready_time = time.perf_counter()
+        if not self._has_image:
+            self._ui.label_Image.setText("")
+        self._ui.versionLineEdit.setPlaceholderText("")
+        self._ui.supportedVersionLineEdit.setPlaceholderText("")
+        self._progress.setVisible(False)
+        self._ui.pushButton_OK.setEnabled(True)
@@ -0,0 +1,234 @@
+try:
+    from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, qDebug
+except Exception:
+    from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, qDebug
+
+import mobase
+
+from typing import Dict
+
+from ..instrumentation import Instrumentation
+from ..localization import localize_string
+from ..mod import (
+    Descriptor,
+    ExclusionFilter,
+    InstallManifest,
+    ModIndex,
+    TreeHelper,
+)
+from ..mod.fstree import tree_from_path
+
+
+class AnalysisWorker(QObject):
+    # Walks the archive tree and lists the archive off the GUI thread.
+    # Nothing in here calls into MO2, extractions are ArchiveExtractor's.
+
+    progress = pyqtSignal(int, str)
+    failed = pyqtSignal(str)
+    analysed = pyqtSignal()
+    finished = pyqtSignal()
+
+    _tree: mobase.IFileTree
+    _instrumentation: Instrumentation
+    _exclusions: ExclusionFilter
+    _archive_path: str
+    _cancelled: bool = False
+
+    install_tree: mobase.IFileTree = None
+    descriptor_entry: mobase.FileTreeEntry = None
+    thumbnail_entry: mobase.FileTreeEntry = None
+    files: Dict = None
+    excluded_bytes: int = None
+    error: str = ""
+
+    def __init__(
+        self,
+        tree: mobase.IFileTree,
+        instrumentation: Instrumentation,
+        exclusions: ExclusionFilter = None,
+        archive_path: str = "",
+    ):
+        super().__init__()
+        self._tree = tree
+        self._instrumentation = instrumentation
+        self._exclusions = exclusions
+        self._archive_path = archive_path
+
+    def cancel(self):
+        # Checked between steps
+        self._cancelled = True
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = str(e)
+            self.failed.emit(self.error)
+        self.finished.emit()
+
+    def _run(self):
+        self.progress.emit(0, localize_string("Analysing archive"))
+        with self._instrumentation.phase("to_installable"):
+            install_tree = TreeHelper.to_installable(
+                self._tree, self._exclusions
+            )
+        if not install_tree:
+            self.error = "to_installable returned None"
+            self.failed.emit(self.error)
+            return
+        if self._cancelled:
+            return
+
+        with self._instrumentation.phase("find_entries"):
+            self.descriptor_entry = TreeHelper.find_descriptor(install_tree)
+            self.thumbnail_entry = TreeHelper.find_thumbnail(install_tree)
+        if self._cancelled:
+            return
+
+        self.progress.emit(30, localize_string("Listing archive"))
+        with self._instrumentation.phase("list_archive"):
+            self.files = self._listFiles()
+        if self._cancelled:
+            return
+
+        self.install_tree = install_tree
+        self.analysed.emit()
+
+    def _listFiles(self) -> Dict:
+        # Sizes and CRCs of the final layout from the archive listing, as
+        # mobase trees have neither. None when the archive can't be listed.
+        if not self._archive_path:
+            return None
+        try:
+            listing = tree_from_path(self._archive_path)
+        except Exception as e:
+            qDebug("Could not list {}: {}".format(self._archive_path, e))
+            return None
+        exclusions = self._exclusions.copy() if self._exclusions else None
+        final_listing = TreeHelper.to_final(listing, exclusions)
+        if not final_listing:
+            return None
+        # Unlike mobase trees, the listing knows what the excluded files
+        # weigh
+        if exclusions:
+            self.excluded_bytes = exclusions.excluded_bytes()
+        return InstallManifest.files_of(final_listing)
+
+
+class ArchiveExtractor(QObject):
+    # The steps that need MO2: extracting the descriptor and thumbnail.
+    # Lives on the GUI thread and runs once AnalysisWorker is done.
+
+    progress = pyqtSignal(int, str)
+    detailsReady = pyqtSignal(str, list, str, str)
+    matchReady = pyqtSignal(str)
+    thumbnailReady = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    ready = pyqtSignal()
+
+    _manager: mobase.IInstallationManager
+    _worker: AnalysisWorker
+    _instrumentation: Instrumentation
+    _mod_index: ModIndex
+    _mod_list: mobase.IModList
+    _cancelled: bool = False
+
+    descriptor: Descriptor = None
+    thumbnail_path: str = ""
+    match: str = ""
+    error: str = ""
+
+    def __init__(
+        self,
+        manager: mobase.IInstallationManager,
+        worker: AnalysisWorker,
+        instrumentation: Instrumentation,
+        mod_index: ModIndex = None,
+        mod_list: mobase.IModList = None,
+    ):
+        super().__init__()
+        self._manager = manager
+        self._worker = worker
+        self._instrumentation = instrumentation
+        self._mod_index = mod_index
+        self._mod_list = mod_list
+
+    def cancel(self):
+        self._cancelled = True
+
+    @pyqtSlot()
+    def run(self):
+        if self._cancelled:
+            return
+        try:
+            self._run()
+        except Exception as e:
+            self.error = str(e)
+            self.failed.emit(self.error)
+
+    def _run(self):
+        worker = self._worker
+        self.progress.emit(50, localize_string("Reading descriptor"))
+        with self._instrumentation.phase("extract_descriptor"):
+            descriptor_path = self._manager.extractFile(
+                worker.descriptor_entry
+            )
+        if self._cancelled:
+            return
+
+        with self._instrumentation.phase("descriptor"):
+            descriptor = Descriptor(descriptor_path)
+        self.detailsReady.emit(
+            descriptor.name(),
+            descriptor.tags(),
+            descriptor.version(),
+            descriptor.supported_version(),
+        )
+
+        if self._mod_index is not None:
+            self.match = self._findMatch(descriptor, worker.files)
+            if self.match:
+                self.matchReady.emit(self.match)
+
+        self.progress.emit(70, localize_string("Extracting thumbnail"))
+        with self._instrumentation.phase("extract_thumbnail"):
+            if worker.thumbnail_entry and not self._cancelled:
+                self.thumbnail_path = self._manager.extractFile(
+                    worker.thumbnail_entry
+                )
+        if self._cancelled:
+            return
+        if self.thumbnail_path:
+            self.thumbnailReady.emit(self.thumbnail_path)
+
+        self.descriptor = descriptor
+        self.progress.emit(100, "")
+        self.ready.emit()
+
+    def _findMatch(self, descriptor: Descriptor, files: Dict) -> str:
+        # Mods renamed in MO2 leave stale entries behind, they are dropped
+        # here rather than offered as a name that no longer exists
+        digest = ModIndex.digest(files)
+        pruned = False
+        while True:
+            match = self._mod_index.find(
+                descriptor.remote_file_id(), descriptor.name(), digest
+            )
+            if (
+                not match
+                or self._mod_list is None
+                or self._mod_list.getMod(match)
+            ):
+                break
+            self._mod_index.remove_mod(match)
+            pruned = True
+        if pruned:
+            try:
+                self._mod_index.save()
+            except OSError:
+                pass
+        return match or ""
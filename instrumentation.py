@@ -0,0 +1,108 @@
+try:
+    from PyQt6.QtCore import qDebug
+except Exception:
+    from PyQt5.QtCore import qDebug
+
+import json
+import os
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class Instrumentation:
+    # Opt-in per-phase timings (and tracemalloc peaks) for one operation,
+    # summarised through qDebug and appended to a JSONL file. Disabled
+    # instances only cost a function call per phase.
+
+    _operation: str
+    _enabled: bool
+    _trace_memory: bool
+    _log_path: str
+    _phases: List[Dict]
+    _counters: Dict[str, int]
+    _start: float
+
+    def __init__(
+        self,
+        operation: str,
+        enabled: bool = False,
+        trace_memory: bool = False,
+        log_path: str = "",
+    ):
+        self._operation = operation
+        self._enabled = enabled
+        self._trace_memory = enabled and trace_memory
+        self._log_path = log_path
+        self._phases = []
+        self._counters = {}
+        self._start = time.perf_counter()
+
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self._enabled:
+            yield
+            return
+
+        started_tracing = False
+        if self._trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {
+                "phase": name,
+                "ms": round((time.perf_counter() - start) * 1000, 3),
+            }
+            if self._trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                record["peak_kb"] = peak >> 10
+                if started_tracing:
+                    tracemalloc.stop()
+            self._phases.append(record)
+
+    def add_phase(self, name: str, seconds: float):
+        # For spans that don't fit a with block, like waiting on a dialog
+        if self._enabled:
+            self._phases.append(
+                {"phase": name, "ms": round(seconds * 1000, 3)}
+            )
+
+    def count(self, name: str, value: int = 1):
+        if self._enabled:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def finish(self, **extra) -> Dict:
+        if not self._enabled:
+            return {}
+
+        summary = {
+            "operation": self._operation,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "phases": self._phases,
+            "counters": self._counters,
+        }
+        summary.update(extra)
+
+        line = json.dumps(summary)
+        qDebug("{}: {}".format(self._operation, line))
+        if self._log_path:
+            try:
+                os.makedirs(os.path.dirname(self._log_path), exist_ok=True)
+                with open(self._log_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError:
+                pass
+        return summary
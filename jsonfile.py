@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+
+from typing import Any, Dict, Optional
+
+# JSON caches and manifests of the plugins and headless tools. Files are
+# written to a temporary file first, so a crash never leaves half of one
+# behind and concurrent writers never share a temporary file.
+
+
+def read_json(path: str) -> Any:
+    # None when the file is missing or not valid JSON
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: str, data: Any, indent: int = None):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def read_cache(path: str, version: int, key: str) -> Optional[Dict]:
+    # The key of a {"version": ..., key: ...} cache, None when there is no
+    # cache or it was written by another version
+    if not path:
+        return None
+    data = read_json(path)
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data.get(key, {})
+
+
+def write_cache(path: str, version: int, key: str, value: Any):
+    if not path:
+        return
+    write_json(path, {"version": version, key: value})
@@ -1,3 +1,10 @@
+from .checksum import ChecksumEngine  # noqa: F401  # type: ignore
+from .conflicts import ConflictIndex  # noqa: F401  # type: ignore
 from .datachecker import ModDataChecker  # noqa: F401  # type: ignore
-from .descriptor import Descriptor  # noqa: F401  # type: ignore
+from .descriptor import Descriptor, clean_mod_name  # noqa: F401  # type: ignore
+from .exclusions import ExclusionFilter  # noqa: F401  # type: ignore
+from .fingerprint import Fingerprinter  # noqa: F401  # type: ignore
+from .manifest import InstallManifest  # noqa: F401  # type: ignore
+from .modindex import ModIndex  # noqa: F401  # type: ignore
 from .tree import TreeHelper  # noqa: F401  # type: ignore
+from .workshop import WorkshopImporter, WorkshopMod  # noqa: F401  # type: ignore
@@ -0,0 +1,110 @@
+import hashlib
+
+from typing import Dict, List, Tuple
+
+from ..jsonfile import read_cache, write_cache
+from .fingerprint import Fingerprinter
+
+
+class ChecksumEngine:
+    # Predicts the game checksum of a profile. Only content under
+    # CHECKSUM_DIRS feeds the checksum, a mod without any leaves it (and
+    # ironman/achievements) untouched.
+
+    CACHE_VERSION: int = 1
+    CHECKSUM_DIRS: List[str] = [
+        "common",
+        "events",
+        "history",
+        "map_data",
+    ]
+
+    _cache_path: str
+    _fingerprinter: Fingerprinter
+    _mods: Dict[str, Dict]
+
+    def __init__(self, fingerprinter: Fingerprinter, cache_path: str = ""):
+        self._fingerprinter = fingerprinter
+        self._cache_path = cache_path
+        self._mods = {}
+        self._load()
+
+    # Classification
+
+    @staticmethod
+    def is_checksum_path(path: str) -> bool:
+        top = path.replace("\\", "/").strip("/").split("/", 1)[0]
+        return top.casefold() in ChecksumEngine.CHECKSUM_DIRS
+
+    # Per-mod Digests
+
+    def update_mod(self, name: str, root: str) -> str:
+        record = self._mods.get(name)
+        if record and record["root"] != root:
+            self._fingerprinter.forget(record["root"])
+        digests = self._fingerprinter.fingerprint(root, self.CHECKSUM_DIRS)
+        dirs = [d for d in self.CHECKSUM_DIRS if d in digests]
+
+        checksum = ""
+        if dirs:
+            digest = hashlib.sha256()
+            for directory in dirs:
+                digest.update(
+                    "{} {}\n".format(directory, digests[directory]).encode()
+                )
+            checksum = digest.hexdigest()
+
+        self._mods[name] = {"root": root, "dirs": dirs, "digest": checksum}
+        return checksum
+
+    def remove_mod(self, name: str):
+        record = self._mods.pop(name, None)
+        if record:
+            self._fingerprinter.forget(record["root"])
+
+    def refresh(self, mods: List[Tuple[str, str]]) -> int:
+        # Re-validates every mod, the Fingerprinter only hashes files whose
+        # size or mtime changed. Returns how many digests changed.
+        updated = 0
+        for name, root in mods:
+            previous = self.digest(name) if name in self._mods else None
+            if self.update_mod(name, root) != previous:
+                updated += 1
+        return updated
+
+    def digest(self, name: str) -> str:
+        record = self._mods.get(name)
+        return record["digest"] if record else ""
+
+    def checksum_dirs(self, name: str) -> List[str]:
+        record = self._mods.get(name)
+        return list(record["dirs"]) if record else []
+
+    # Profile
+
+    def affecting_mods(self, names: List[str]) -> List[str]:
+        return [name for name in names if self.digest(name)]
+
+    def profile_checksum(self, names: List[str]) -> str:
+        # names in load order, "" when the profile matches vanilla
+        affecting = self.affecting_mods(names)
+        if not affecting:
+            return ""
+        digest = hashlib.sha256()
+        for name in affecting:
+            digest.update("{}\n".format(self.digest(name)).encode())
+        return digest.hexdigest()
+
+    def breaks_ironman(self, names: List[str]) -> bool:
+        return bool(self.affecting_mods(names))
+
+    # Cache
+
+    def save(self):
+        self._fingerprinter.save()
+        write_cache(self._cache_path, self.CACHE_VERSION, "mods", self._mods)
+
+    def _load(self):
+        self._mods = (
+            read_cache(self._cache_path, self.CACHE_VERSION, "mods") or {}
+        )
@@ -0,0 +1,271 @@
+import hashlib
+import os
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..jsonfile import read_cache, write_cache
+from .descriptor import Descriptor
+from .tree import TreeHelper
+
+
+class ConflictIndex:
+    # Maps casefolded relative paths ("common/traits/00_traits.txt") to the
+    # mods providing them, ordered by priority (lowest first), so the last
+    # provider is the one the game loads. Every mod is indexed, queries
+    # only count the active ones.
+
+    CACHE_VERSION: int = 2
+
+    _cache_path: str
+    _mods: Dict[str, Dict]
+    _priorities: Dict[str, int]
+    _providers: Dict[str, List[str]]
+    _replacers: Dict[str, List[str]]
+    _active: Optional[Set[str]]
+
+    def __init__(self, cache_path: str = ""):
+        self._cache_path = cache_path
+        self._mods = {}
+        self._priorities = {}
+        self._providers = {}
+        self._replacers = {}
+        self._active = None
+
+    # Persistence
+
+    def load(self) -> bool:
+        mods = read_cache(self._cache_path, self.CACHE_VERSION, "mods")
+        if mods is None:
+            return False
+
+        for name, record in mods.items():
+            self._mods[name] = record
+            self._link(name)
+        return True
+
+    def save(self):
+        write_cache(self._cache_path, self.CACHE_VERSION, "mods", self._mods)
+
+    # Updates
+
+    def refresh(self, mods: List[Tuple]) -> int:
+        # mods is (name, root) or (name, root, replace_paths) in priority
+        # order, lowest first. replace_paths is what the descriptor said
+        # at install or import time, None to read descriptor.mod from the
+        # mod.
+        # Only mods that are new or changed on disk are walked again.
+        # Returns the number of mods that were (re)indexed.
+        wanted = {mod[0] for mod in mods}
+        for name in list(self._mods):
+            if name not in wanted:
+                self.remove_mod(name)
+
+        indexed = 0
+        self.set_priorities([mod[0] for mod in mods])
+        for name, root, *rest in mods:
+            replace_paths = self._replace_keys(root, *rest)
+            record = self._mods.get(name)
+            if (
+                record
+                and record["root"] == root
+                and record["replace"] == replace_paths
+                and record["signature"] == self._signature(root)
+            ):
+                continue
+            self.set_mod(name, root, replace_paths=replace_paths)
+            indexed += 1
+        return indexed
+
+    def set_mod(
+        self,
+        name: str,
+        root: str,
+        priority: Optional[int] = None,
+        replace_paths: Optional[List[str]] = None,
+    ):
+        if name in self._mods:
+            self._unlink(name)
+        if priority is not None:
+            self._priorities[name] = priority
+        self._mods[name] = {
+            "root": root,
+            "signature": self._signature(root),
+            "files": self._walk(root),
+            "replace": self._replace_keys(root, replace_paths),
+        }
+        self._link(name)
+
+    def remove_mod(self, name: str):
+        if name not in self._mods:
+            return
+        self._unlink(name)
+        del self._mods[name]
+        self._priorities.pop(name, None)
+
+    def set_priorities(self, names: List[str]):
+        self._priorities = {name: i for i, name in enumerate(names)}
+        for providers in self._providers.values():
+            providers.sort(key=self._priority)
+        for replacers in self._replacers.values():
+            replacers.sort(key=self._priority)
+
+    def set_active(self, names: Optional[List[str]]):
+        # None counts every indexed mod as active
+        self._active = None if names is None else set(names)
+
+    # Queries
+
+    def providers(self, path: str) -> List[str]:
+        return self._only_active(self._providers.get(self._key(path), []))
+
+    def winner(self, path: str) -> Optional[str]:
+        # None when no mod provides the file, or when a higher priority
+        # mod wipes its directory through replace_path
+        key = self._key(path)
+        providers = self.providers(key)
+        if not providers:
+            return None
+        winner = providers[-1]
+
+        parent = key
+        while "/" in parent:
+            parent = parent.rsplit("/", 1)[0]
+            replacers = self._only_active(self._replacers.get(parent, []))
+            if replacers and self._priority(replacers[-1]) > self._priority(
+                winner
+            ):
+                return None
+        return winner
+
+    def replaced_by(self, path: str) -> List[str]:
+        key = self._key(path)
+        replacers = []
+        parent = key
+        while "/" in parent:
+            parent = parent.rsplit("/", 1)[0]
+            replacers.extend(
+                self._only_active(self._replacers.get(parent, []))
+            )
+        return replacers
+
+    def conflicts(self) -> Dict[str, List[str]]:
+        conflicts = {}
+        for path, providers in self._providers.items():
+            providers = self._only_active(providers)
+            if len(providers) > 1:
+                conflicts[path] = providers
+        return conflicts
+
+    def files(self, name: str) -> List[str]:
+        record = self._mods.get(name)
+        return list(record["files"]) if record else []
+
+    # Internals
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return path.replace("\\", "/").strip("/").casefold()
+
+    def _priority(self, name: str) -> int:
+        return self._priorities.get(name, -1)
+
+    def _only_active(self, names: List[str]) -> List[str]:
+        if self._active is None:
+            return list(names)
+        return [name for name in names if name in self._active]
+
+    def _link(self, name: str):
+        record = self._mods[name]
+        for path in record["files"]:
+            providers = self._providers.setdefault(path, [])
+            providers.append(name)
+            providers.sort(key=self._priority)
+        for path in record["replace"]:
+            replacers = self._replacers.setdefault(path, [])
+            replacers.append(name)
+            replacers.sort(key=self._priority)
+
+    def _unlink(self, name: str):
+        record = self._mods[name]
+        for path in record["files"]:
+            self._discard(self._providers, path, name)
+        for path in record["replace"]:
+            self._discard(self._replacers, path, name)
+
+    @staticmethod
+    def _discard(index: Dict[str, List[str]], path: str, name: str):
+        names = index.get(path)
+        if not names:
+            return
+        if name in names:
+            names.remove(name)
+        if not names:
+            del index[path]
+
+    @staticmethod
+    def _signature(root: str) -> str:
+        # Digest of every directory mtime under the content directories.
+        # Adding, removing or renaming a file changes its directory's
+        # mtime, and only directories are stat'ed.
+        sha1 = hashlib.sha1()
+        pending = [root]
+        while pending:
+            path = pending.pop()
+            try:
+                sha1.update(
+                    "{}\0{}\n".format(path, os.stat(path).st_mtime_ns).encode()
+                )
+                with os.scandir(path) as it:
+                    dirs = [entry.path for entry in it if entry.is_dir()]
+            except OSError:
+                continue
+            if path == root:
+                dirs = [
+                    d
+                    for d in dirs
+                    if os.path.basename(d).casefold() in TreeHelper.VALID_DIRS
+                ]
+            pending.extend(sorted(dirs, reverse=True))
+        return sha1.hexdigest()
+
+    @staticmethod
+    def _walk(root: str) -> List[str]:
+        files = []
+        try:
+            top_entries = list(os.scandir(root))
+        except OSError:
+            return files
+
+        for top in top_entries:
+            if not top.is_dir():
+                continue
+            if top.name.casefold() not in TreeHelper.VALID_DIRS:
+                continue
+            for dir_path, _, file_names in os.walk(top.path):
+                rel_dir = os.path.relpath(dir_path, root)
+                for file_name in file_names:
+                    files.append(
+                        ConflictIndex._key(os.path.join(rel_dir, file_name))
+                    )
+        return files
+
+    @staticmethod
+    def _replace_keys(
+        root: str, replace_paths: Optional[List[str]] = None
+    ) -> List[str]:
+        if replace_paths is None:
+            replace_paths = ConflictIndex._replace_paths(root)
+        return sorted({ConflictIndex._key(p) for p in replace_paths})
+
+    @staticmethod
+    def _replace_paths(root: str) -> List[str]:
+        # Only mods with a descriptor.mod put there by hand, installs and
+        # Workshop imports have theirs recorded on the mod instead
+        descriptor_path = os.path.join(root, "descriptor.mod")
+        if not os.path.isfile(descriptor_path):
+            return []
+        try:
+            descriptor = Descriptor(descriptor_path)
+        except (OSError, UnicodeDecodeError):
+            return []
+        return descriptor.replace_paths()
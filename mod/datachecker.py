@@ -1,4 +1,8 @@
-import mobase
+try:
+    import mobase
+except ImportError:
+    # Outside of MO2, see fstree
+    from . import fstree as mobase
 from .tree import TreeHelper
 
 
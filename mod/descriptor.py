@@ -2,11 +2,22 @@ import re
 from typing import List
 
 
+def clean_mod_name(name: str) -> str:
+    safe_chars = [" ", ".", "_"]
+    name_chars = []
+    for c in name:
+        safe_c = c if c in safe_chars or c.isalnum() else "_"
+        name_chars.append(safe_c)
+    return "".join(name_chars).rstrip()
+
+
 class Descriptor:
     _version: str = ""
     _name: str = ""
     _tags: List[str] = []
     _supported_version: str = ""
+    _remote_file_id: str = ""
+    _replace_paths: List[str] = []
 
     def __init__(self, descriptor_path: str):
         with open(
@@ -35,6 +46,16 @@ class Descriptor:
         if match:
             self._supported_version = match.group(1)
 
+        match = re.search(
+            r"^remote_file_id=\"(.+)\"$", content, re.MULTILINE
+        )
+        if match:
+            self._remote_file_id = match.group(1)
+
+        self._replace_paths = re.findall(
+            r"^replace_path=\"(.+)\"$", content, re.MULTILINE
+        )
+
     def version(self) -> str:
         return self._version
 
@@ -46,3 +67,9 @@ class Descriptor:
 
     def supported_version(self) -> str:
         return self._supported_version
+
+    def remote_file_id(self) -> str:
+        return self._remote_file_id
+
+    def replace_paths(self) -> List[str]:
+        return self._replace_paths
@@ -0,0 +1,142 @@
+import fnmatch
+
+from typing import List
+
+try:
+    import mobase
+except ImportError:
+    # Outside of MO2, see fstree
+    from . import fstree as mobase
+
+
+class ExclusionFilter:
+    # Glob patterns for entries the game never reads. A pattern starting
+    # with "/" is matched against the path from the mod root, one with a
+    # "/" elsewhere against the full path, anything else against each
+    # entry name. Matching is case-insensitive.
+
+    DEFAULT_PATTERNS: List[str] = [
+        ".git",
+        ".svn",
+        ".hg",
+        ".vscode",
+        ".idea",
+        "/tests",
+        "/tools",
+        "*.psd",
+        "*.blend",
+        "*.blend1",
+        "*.xcf",
+        "*.kra",
+        "*.bak",
+        "*.tmp",
+        "*~",
+        "Thumbs.db",
+        "desktop.ini",
+    ]
+
+    _patterns: List[str]
+    _anchored: List[str]
+    _paths: List[str]
+    _names: List[str]
+    _excluded_entries: int
+    _excluded_bytes: int
+
+    def __init__(self, patterns: List[str] = None):
+        self._patterns = list(
+            self.DEFAULT_PATTERNS if patterns is None else patterns
+        )
+        self._anchored = []
+        self._paths = []
+        self._names = []
+        for pattern in self._patterns:
+            pattern = pattern.strip().replace("\\", "/").casefold()
+            if not pattern:
+                continue
+            if pattern.startswith("/"):
+                self._anchored.append(pattern.strip("/"))
+            elif "/" in pattern:
+                self._paths.append(pattern.strip("/"))
+            else:
+                self._names.append(pattern)
+        self.reset()
+
+    @staticmethod
+    def from_setting(setting: str) -> "ExclusionFilter":
+        return ExclusionFilter(setting.split(","))
+
+    def copy(self) -> "ExclusionFilter":
+        # Same patterns, fresh statistics
+        return ExclusionFilter(self._patterns)
+
+    # Matching
+
+    def matches(self, path: str) -> bool:
+        path = path.replace("\\", "/").strip("/").casefold()
+        name = path.rsplit("/", 1)[-1]
+        for pattern in self._names:
+            if fnmatch.fnmatchcase(name, pattern):
+                return True
+        for pattern in self._anchored + self._paths:
+            if fnmatch.fnmatchcase(path, pattern):
+                return True
+        for pattern in self._paths:
+            if fnmatch.fnmatchcase(path, "*/" + pattern):
+                return True
+        return False
+
+    def apply(self, tree: mobase.IFileTree, prefix: str = "") -> int:
+        # Detaches matching entries from tree, and the folders they leave
+        # empty. Returns how many files were removed (the totals are kept
+        # in excluded_entries/bytes).
+        matched = []
+        emptied = []
+        removed = 0
+        for entry in tree:
+            path = entry.name()
+            if prefix:
+                path = "{}/{}".format(prefix, path)
+            if self.matches(path):
+                matched.append(entry)
+            elif entry.isDir():
+                files = self.apply(entry, path)
+                if files and not len(entry):
+                    emptied.append(entry)
+                removed += files
+
+        for entry in emptied:
+            entry.detach()
+        return removed + sum(self.exclude(entry) for entry in matched)
+
+    def exclude(self, entry: mobase.FileTreeEntry) -> int:
+        files, size = self._measure(entry)
+        self._excluded_entries += files
+        self._excluded_bytes += size
+        entry.detach()
+        return files
+
+    # Statistics
+
+    def reset(self):
+        self._excluded_entries = 0
+        self._excluded_bytes = 0
+
+    def excluded_entries(self) -> int:
+        return self._excluded_entries
+
+    def excluded_bytes(self) -> int:
+        # Only known for trees that expose sizes (fstree), mobase trees
+        # don't and the installer takes it from the archive listing
+        return self._excluded_bytes
+
+    @staticmethod
+    def _measure(entry: mobase.FileTreeEntry):
+        if entry.isDir():
+            files, size = 0, 0
+            for child in entry:
+                child_files, child_size = ExclusionFilter._measure(child)
+                files += child_files
+                size += child_size
+            return files, size
+        size = entry.size() if hasattr(entry, "size") else 0
+        return 1, size
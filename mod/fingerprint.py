@@ -0,0 +1,204 @@
+import hashlib
+import mmap
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from ..jsonfile import read_cache, write_cache
+from .tree import TreeHelper
+
+
+def hash_file(path: str, mmap_threshold: int) -> str:
+    # hashlib releases the GIL while digesting large buffers, so worker
+    # threads hash in parallel
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                digest.update(data)
+        else:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Fingerprinter:
+    # Content fingerprints of a mod's VALID_DIRS. Every directory gets a
+    # Merkle style digest over its children, keyed by casefolded relative
+    # path, and "" holds the digest of the whole mod. File hashes are
+    # cached per mod root and dropped once the files are gone.
+
+    CACHE_VERSION: int = 2
+    MMAP_THRESHOLD: int = 4 * 1024 * 1024
+
+    _cache_path: str
+    _cache: Dict[str, Dict[str, Dict]]
+    _max_workers: Optional[int]
+    _hashed: int
+
+    def __init__(self, cache_path: str = "", max_workers: int = None):
+        self._cache_path = cache_path
+        self._cache = {}
+        self._max_workers = max_workers
+        self._hashed = 0
+        self._load()
+
+    # Fingerprints
+
+    def fingerprint(
+        self, root: str, dirs: List[str] = None
+    ) -> Dict[str, str]:
+        # dirs limits the walk to some top level directories
+        dirs = dirs or TreeHelper.VALID_DIRS
+        files = self._collect(root, dirs)
+        cache = self._cache.setdefault(root, {})
+        self._prune(cache, files, dirs)
+        self._hash_stale(cache, files)
+
+        children: Dict[str, List[Tuple[str, str, str]]] = {"": []}
+        for rel_path, _, _ in files:
+            entry = cache.get(rel_path)
+            if not entry:
+                # Gone before it could be hashed
+                continue
+            parts = rel_path.split("/")
+            for depth in range(1, len(parts)):
+                parent = "/".join(parts[: depth - 1])
+                directory = "/".join(parts[:depth])
+                if directory not in children:
+                    children[directory] = []
+                    children[parent].append(("d", parts[depth - 1], directory))
+            children["/".join(parts[:-1])].append(
+                ("f", parts[-1], entry["hash"])
+            )
+
+        digests: Dict[str, str] = {}
+        for directory in sorted(children, key=len, reverse=True):
+            digest = hashlib.sha256()
+            for kind, name, value in sorted(children[directory]):
+                if kind == "d":
+                    value = digests[value]
+                digest.update("{} {} {}\n".format(kind, name, value).encode())
+            digests[directory] = digest.hexdigest()
+        return digests
+
+    def mod_digest(self, root: str) -> str:
+        return self.fingerprint(root)[""]
+
+    def duplicates(self, mods: List[Tuple[str, str]]) -> List[List[str]]:
+        # mods is (name, root), returns groups of mods with identical
+        # content. Mods without any content aren't duplicates of anything.
+        groups: Dict[str, List[str]] = {}
+        for name, root in mods:
+            digests = self.fingerprint(root)
+            if len(digests) == 1:
+                continue
+            groups.setdefault(digests[""], []).append(name)
+        return [names for names in groups.values() if len(names) > 1]
+
+    def forget(self, root: str):
+        # Drops the cached hashes of a removed or moved mod
+        self._cache.pop(root, None)
+
+    def hashed(self) -> int:
+        # Files hashed by the last fingerprint() call, the rest came
+        # from the cache
+        return self._hashed
+
+    # Cache
+
+    def save(self):
+        write_cache(
+            self._cache_path, self.CACHE_VERSION, "files", self._cache
+        )
+
+    def _load(self):
+        self._cache = (
+            read_cache(self._cache_path, self.CACHE_VERSION, "files") or {}
+        )
+
+    # Internals
+
+    @staticmethod
+    def _collect(
+        root: str, dirs: List[str]
+    ) -> List[Tuple[str, str, os.stat_result]]:
+        files = []
+        try:
+            top_entries = list(os.scandir(root))
+        except OSError:
+            return files
+
+        for top in top_entries:
+            if not top.is_dir():
+                continue
+            if top.name.casefold() not in dirs:
+                continue
+            for dir_path, _, file_names in os.walk(top.path):
+                rel_dir = os.path.relpath(dir_path, root)
+                for file_name in file_names:
+                    path = os.path.join(dir_path, file_name)
+                    rel_path = (
+                        os.path.join(rel_dir, file_name)
+                        .replace("\\", "/")
+                        .casefold()
+                    )
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        # Removed meanwhile, or a broken link
+                        continue
+                    files.append((rel_path, path, stat))
+        return files
+
+    @staticmethod
+    def _prune(
+        cache: Dict[str, Dict],
+        files: List[Tuple[str, str, os.stat_result]],
+        dirs: List[str],
+    ):
+        # Only the walked directories are known to be complete
+        current = {rel_path for rel_path, _, _ in files}
+        for rel_path in list(cache):
+            if rel_path not in current and rel_path.split("/", 1)[0] in dirs:
+                del cache[rel_path]
+
+    def _hash(self, path: str) -> Optional[str]:
+        try:
+            return hash_file(path, self.MMAP_THRESHOLD)
+        except OSError:
+            return None
+
+    def _hash_stale(
+        self,
+        cache: Dict[str, Dict],
+        files: List[Tuple[str, str, os.stat_result]],
+    ):
+        stale = []
+        for rel_path, path, stat in files:
+            entry = cache.get(rel_path)
+            if (
+                entry
+                and entry["size"] == stat.st_size
+                and entry["mtime"] == stat.st_mtime_ns
+            ):
+                continue
+            stale.append((rel_path, path, stat))
+
+        self._hashed = len(stale)
+        if not stale:
+            return
+
+        with ThreadPoolExecutor(self._max_workers) as executor:
+            hashes = executor.map(self._hash, [path for _, path, _ in stale])
+            for (rel_path, _, stat), file_hash in zip(stale, hashes):
+                if file_hash is None:
+                    cache.pop(rel_path, None)
+                    continue
+                cache[rel_path] = {
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime_ns,
+                    "hash": file_hash,
+                }
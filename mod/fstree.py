@@ -0,0 +1,335 @@
+import enum
+import os
+import shutil
+import subprocess
+import tempfile
+import zipfile
+
+from typing import Dict, Iterator, List, Optional
+
+# Pure Python stand-in for the parts of mobase that TreeHelper and
+# ModDataChecker use, so archives and folders can be classified outside
+# of MO2. Trees are built from a directory walk or an archive listing,
+# nothing is extracted (extract_files pulls single files back out).
+
+
+class FileTreeEntry:
+    class FileTypes(enum.IntFlag):
+        FILE = 1
+        DIRECTORY = 2
+        FILE_OR_DIRECTORY = 3
+
+    _name: str
+    _parent: Optional["IFileTree"]
+    _size: int
+    _crc: int
+    _source: str
+
+    def __init__(
+        self,
+        name: str,
+        parent: "IFileTree" = None,
+        size: int = 0,
+        crc: int = 0,
+        source: str = "",
+    ):
+        self._name = name
+        self._parent = parent
+        self._size = size
+        self._crc = crc
+        self._source = source
+
+    def name(self) -> str:
+        return self._name
+
+    def suffix(self) -> str:
+        if self.isDir():
+            return ""
+        _, _, suffix = self._name.rpartition(".")
+        return suffix if "." in self._name else ""
+
+    def parent(self) -> Optional["IFileTree"]:
+        return self._parent
+
+    def isDir(self) -> bool:
+        return False
+
+    def isFile(self) -> bool:
+        return not self.isDir()
+
+    def fileType(self) -> "FileTreeEntry.FileTypes":
+        if self.isDir():
+            return FileTreeEntry.FileTypes.DIRECTORY
+        return FileTreeEntry.FileTypes.FILE
+
+    def path(self, sep: str = "\\") -> str:
+        names = []
+        entry = self
+        while entry._parent is not None:
+            names.append(entry._name)
+            entry = entry._parent
+        return sep.join(reversed(names))
+
+    def size(self) -> int:
+        return self._size
+
+    def crc(self) -> int:
+        return self._crc
+
+    def source(self) -> str:
+        # Path of the entry inside the archive or directory it was listed
+        # from, kept across copies
+        return self._source
+
+    def detach(self) -> bool:
+        if self._parent is None:
+            return False
+        self._parent._remove(self)
+        self._parent = None
+        return True
+
+    def _clone(self, name: str, parent: "IFileTree") -> "FileTreeEntry":
+        return FileTreeEntry(
+            name, parent, self._size, self._crc, self._source
+        )
+
+
+class IFileTree(FileTreeEntry):
+    _entries: Dict[str, FileTreeEntry]
+    _sorted: Optional[List[FileTreeEntry]]
+
+    def __init__(self, name: str = "", parent: "IFileTree" = None):
+        super().__init__(name, parent)
+        self._entries = {}
+        self._sorted = None
+
+    def isDir(self) -> bool:
+        return True
+
+    def __iter__(self) -> Iterator[FileTreeEntry]:
+        # Same order as mobase: directories first, then case-insensitive
+        if self._sorted is None:
+            self._sorted = sorted(
+                self._entries.values(),
+                key=lambda e: (e.isFile(), e.name().casefold()),
+            )
+        return iter(self._sorted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def find(
+        self,
+        path: str,
+        file_type: FileTreeEntry.FileTypes = (
+            FileTreeEntry.FileTypes.FILE_OR_DIRECTORY
+        ),
+    ) -> Optional[FileTreeEntry]:
+        entry = self
+        for name in self._split(path):
+            if not entry.isDir():
+                return None
+            entry = entry._entries.get(name.casefold())
+            if entry is None:
+                return None
+        if entry is self or not entry.fileType() & file_type:
+            return None
+        return entry
+
+    def walk(self) -> Iterator[FileTreeEntry]:
+        for entry in self:
+            yield entry
+            if entry.isDir():
+                yield from entry.walk()
+
+    def createOrphanTree(self, name: str = "") -> "IFileTree":
+        return IFileTree(name)
+
+    def copy(
+        self, entry: FileTreeEntry, path: str = "", insert_policy: int = 0
+    ) -> Optional[FileTreeEntry]:
+        parent = self
+        name = entry.name()
+        names = self._split(path)
+        if names and not path.endswith(("/", "\\")):
+            name = names.pop()
+        for dir_name in names:
+            parent = parent.addDirectory(dir_name)
+        clone = entry._clone(name, parent)
+        parent._insert(clone)
+        return clone
+
+    def addDirectory(self, path: str) -> "IFileTree":
+        tree = self
+        names = self._split(path)
+        for depth, name in enumerate(names, 1):
+            child = tree._entries.get(name.casefold())
+            if child is None or not child.isDir():
+                child = IFileTree(name, tree)
+                child._source = "/".join(names[:depth])
+                tree._insert(child)
+            tree = child
+        return tree
+
+    def addFile(
+        self, path: str, size: int = 0, crc: int = 0, source: str = ""
+    ) -> FileTreeEntry:
+        names = self._split(path)
+        parent = self.addDirectory("/".join(names[:-1]))
+        entry = FileTreeEntry(names[-1], parent, size, crc, source or path)
+        parent._insert(entry)
+        return entry
+
+    def _clone(self, name: str, parent: "IFileTree") -> "IFileTree":
+        tree = IFileTree(name, parent)
+        tree._source = self._source
+        for child in self._entries.values():
+            tree._insert(child._clone(child.name(), tree))
+        return tree
+
+    def _insert(self, entry: FileTreeEntry):
+        self._entries[entry.name().casefold()] = entry
+        self._sorted = None
+
+    def _remove(self, entry: FileTreeEntry):
+        self._entries.pop(entry.name().casefold(), None)
+        self._sorted = None
+
+    @staticmethod
+    def _split(path: str) -> List[str]:
+        return [name for name in path.replace("\\", "/").split("/") if name]
+
+
+# mobase.ModDataChecker, only what ModDataChecker derives from
+
+
+class ModDataChecker:
+    class CheckReturn(enum.Enum):
+        INVALID = 0
+        FIXABLE = 1
+        VALID = 2
+
+    def __init__(self):
+        pass
+
+
+# Builders
+
+
+def tree_from_directory(root: str) -> IFileTree:
+    tree = IFileTree()
+    for dir_path, dir_names, file_names in os.walk(root):
+        rel_dir = os.path.relpath(dir_path, root)
+        rel_dir = "" if rel_dir == "." else rel_dir
+        for dir_name in dir_names:
+            tree.addDirectory(os.path.join(rel_dir, dir_name))
+        for file_name in file_names:
+            rel_path = os.path.join(rel_dir, file_name)
+            size = os.path.getsize(os.path.join(dir_path, file_name))
+            tree.addFile(rel_path, size=size)
+    return tree
+
+
+def tree_from_zip(archive_path: str) -> IFileTree:
+    tree = IFileTree()
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                tree.addDirectory(info.filename)
+            else:
+                tree.addFile(
+                    info.filename, size=info.file_size, crc=info.CRC
+                )
+    return tree
+
+
+def _7z_executable() -> str:
+    executable = shutil.which("7z") or shutil.which("7za")
+    if not executable:
+        raise OSError("7z executable not found")
+    return executable
+
+
+def tree_from_7z(archive_path: str) -> IFileTree:
+    # Uses the 7z command line tool, which also lists .rar archives
+    executable = _7z_executable()
+
+    output = subprocess.run(
+        [executable, "l", "-slt", "-ba", archive_path],
+        check=True,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ).stdout
+
+    tree = IFileTree()
+    for block in output.replace("\r\n", "\n").split("\n\n"):
+        fields = {}
+        for line in block.split("\n"):
+            key, sep, value = line.partition(" = ")
+            if sep:
+                fields[key] = value
+        path = fields.get("Path")
+        if not path:
+            continue
+        attributes = fields.get("Attributes", "")
+        if fields.get("Folder") == "+" or attributes.startswith("D"):
+            tree.addDirectory(path)
+        else:
+            tree.addFile(
+                path,
+                size=int(fields.get("Size") or 0),
+                crc=int(fields.get("CRC") or "0", 16),
+            )
+    return tree
+
+
+def tree_from_path(path: str) -> IFileTree:
+    if os.path.isdir(path):
+        return tree_from_directory(path)
+    if zipfile.is_zipfile(path):
+        return tree_from_zip(path)
+    return tree_from_7z(path)
+
+
+# Extraction
+
+
+def extract_files(path: str, members: Dict[str, str]):
+    # members maps the source() of file entries to where they are written
+    for target in members.values():
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    if os.path.isdir(path):
+        for source, target in members.items():
+            shutil.copy2(os.path.join(path, source), target)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for source, target in members.items():
+                with archive.open(source) as data, open(target, "wb") as f:
+                    shutil.copyfileobj(data, f, 1024 * 1024)
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list_path = os.path.join(temp_dir, "files.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(members) + "\n")
+            output_dir = os.path.join(temp_dir, "out")
+            subprocess.run(
+                [
+                    _7z_executable(),
+                    "x",
+                    "-y",
+                    "-scsUTF-8",
+                    "-o" + output_dir,
+                    path,
+                    "@" + list_path,
+                ],
+                check=True,
+                capture_output=True,
+            )
+            for source, target in members.items():
+                shutil.move(os.path.join(output_dir, source), target)
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import re
+import sys
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from ..jsonfile import read_cache, write_cache
+
+_LANGUAGE_FILE = re.compile(r"_l_(\w+)\.yml$", re.IGNORECASE)
+_LANGUAGE_HEADER = re.compile(r"^\s*l_(\w+)\s*:\s*$")
+_KEY_LINE = re.compile(r"^\s*([^\s#:\"]+):\d*\s+\"")
+
+# Headless report, run from the folder containing the plugin:
+#   python -m <plugin folder>.mod.locscan <mod folder>... --cache loc.json
+# Mod folders go lowest priority first. Prints one JSON line per key that
+# collides between mods or is overridden through replace/.
+
+# (mod name, file relative to the mod, line number)
+Location = Tuple[str, str, int]
+
+
+def scan_file(path: str) -> Tuple[str, List[Tuple[str, int]]]:
+    # Returns the file's language and its (key, line) pairs. Only the
+    # header and key prefixes matter, values are never parsed.
+    match = _LANGUAGE_FILE.search(path)
+    language = match.group(1).casefold() if match else ""
+    keys = []
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        for line_num, line in enumerate(f, 1):
+            match = _KEY_LINE.match(line)
+            if match:
+                keys.append((match.group(1), line_num))
+                continue
+            if not keys:
+                match = _LANGUAGE_HEADER.match(line)
+                if match:
+                    language = match.group(1).casefold()
+    return language, keys
+
+
+def _scan_files(paths: List[str]) -> List[Tuple[str, str, List]]:
+    results = []
+    for path in paths:
+        try:
+            language, keys = scan_file(path)
+        except OSError:
+            continue
+        results.append((path, language, keys))
+    return results
+
+
+class LocalizationScanner:
+    CACHE_VERSION: int = 1
+    CHUNK_SIZE: int = 16
+
+    _cache_path: str
+    _cache: Dict[str, Dict]
+    _max_workers: Optional[int]
+    _processes: bool
+    _index: Dict[str, Dict[str, List[Location]]]
+    _replace: Dict[str, Dict[str, List[Location]]]
+
+    def __init__(
+        self,
+        cache_path: str = "",
+        max_workers: int = None,
+        processes: bool = True,
+    ):
+        # processes=False inside MO2, its embedded interpreter can't start
+        # worker processes
+        self._cache_path = cache_path
+        self._cache = {}
+        self._max_workers = max_workers
+        self._processes = processes
+        self._index = {}
+        self._replace = {}
+        self._load()
+
+    # Scanning
+
+    def scan(self, mods: List[Tuple[str, str]]) -> int:
+        # mods is (name, root) in priority order, lowest first.
+        # Returns the number of files that had to be parsed.
+        files: List[Tuple[str, str, str]] = []
+        stale: List[str] = []
+        for mod_name, root in mods:
+            for path, rel_path in self._find_files(root):
+                files.append((mod_name, path, rel_path))
+                if not self._is_cached(path):
+                    stale.append(path)
+
+        if stale:
+            self._parse(stale)
+
+        self._index = {}
+        self._replace = {}
+        for mod_name, path, rel_path in files:
+            entry = self._cache.get(path)
+            if not entry:
+                continue
+            is_replace = "replace" in rel_path.casefold().split("/")[:-1]
+            index = self._replace if is_replace else self._index
+            keys = index.setdefault(entry["language"], {})
+            for key, line in entry["keys"]:
+                keys.setdefault(key, []).append((mod_name, rel_path, line))
+
+        live = {path for _, path, _ in files}
+        for path in list(self._cache):
+            if path not in live:
+                del self._cache[path]
+        self._save()
+        return len(stale)
+
+    # Results
+
+    def languages(self) -> List[str]:
+        return sorted(set(self._index) | set(self._replace))
+
+    def locations(self, language: str, key: str) -> List[Location]:
+        return list(self._index.get(language, {}).get(key, [])) + list(
+            self._replace.get(language, {}).get(key, [])
+        )
+
+    def collisions(self, language: str) -> Dict[str, List[Location]]:
+        # Keys defined by more than one mod outside of replace/, the last
+        # location is the one the game ends up showing
+        collisions = {}
+        for key, locations in self._index.get(language, {}).items():
+            if len({mod for mod, _, _ in locations}) > 1:
+                collisions[key] = locations
+        return collisions
+
+    def overrides(self, language: str) -> Dict[str, List[Location]]:
+        # Keys redefined under replace/, together with the regular
+        # definitions they override
+        overrides = {}
+        regular = self._index.get(language, {})
+        for key, locations in self._replace.get(language, {}).items():
+            overrides[key] = list(regular.get(key, [])) + locations
+        return overrides
+
+    def report(self, mod_name: str = None) -> List[Dict]:
+        # Collisions and overrides of every language, only those involving
+        # mod_name when given
+        records = []
+        for language in self.languages():
+            for kind, keys in (
+                ("collision", self.collisions(language)),
+                ("override", self.overrides(language)),
+            ):
+                for key, locations in sorted(keys.items()):
+                    if mod_name and mod_name not in {
+                        mod for mod, _, _ in locations
+                    }:
+                        continue
+                    records.append(
+                        {
+                            "type": kind,
+                            "language": language,
+                            "key": key,
+                            "locations": [list(loc) for loc in locations],
+                        }
+                    )
+        return records
+
+    # Internals
+
+    @staticmethod
+    def _find_files(root: str):
+        loc_root = None
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    if (
+                        entry.is_dir()
+                        and entry.name.casefold() == "localization"
+                    ):
+                        loc_root = entry.path
+                        break
+        except OSError:
+            return
+
+        if not loc_root:
+            return
+
+        for dir_path, _, file_names in os.walk(loc_root):
+            for file_name in file_names:
+                if not file_name.casefold().endswith(".yml"):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                rel_path = os.path.relpath(path, root).replace("\\", "/")
+                yield path, rel_path
+
+    def _is_cached(self, path: str) -> bool:
+        entry = self._cache.get(path)
+        if not entry:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return (
+            entry["mtime"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        )
+
+    def _parse(self, paths: List[str]):
+        stats = {}
+        for path in paths:
+            stat = os.stat(path)
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+
+        chunks = [
+            paths[i : i + self.CHUNK_SIZE]
+            for i in range(0, len(paths), self.CHUNK_SIZE)
+        ]
+        if len(chunks) == 1:
+            results = [_scan_files(chunks[0])]
+        else:
+            pool = (
+                ProcessPoolExecutor if self._processes else ThreadPoolExecutor
+            )
+            with pool(self._max_workers) as executor:
+                results = list(executor.map(_scan_files, chunks))
+
+        for chunk in results:
+            for path, language, keys in chunk:
+                mtime, size = stats[path]
+                self._cache[path] = {
+                    "mtime": mtime,
+                    "size": size,
+                    "language": language,
+                    "keys": keys,
+                }
+
+    def _load(self):
+        self._cache = (
+            read_cache(self._cache_path, self.CACHE_VERSION, "files") or {}
+        )
+
+    def _save(self):
+        write_cache(
+            self._cache_path, self.CACHE_VERSION, "files", self._cache
+        )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Report Crusader Kings III localization keys defined "
+        "by more than one mod"
+    )
+    parser.add_argument(
+        "mods", nargs="+", help="mod folders, lowest priority first"
+    )
+    parser.add_argument(
+        "--cache", default="", help="parsed files kept between runs"
+    )
+    parser.add_argument("--mod", default=None, help="only report this mod")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    scanner = LocalizationScanner(args.cache, args.workers)
+    mods = [
+        (os.path.basename(os.path.normpath(root)), root) for root in args.mods
+    ]
+    parsed = scanner.scan(mods)
+    records = scanner.report(args.mod)
+    for record in records:
+        print(json.dumps(record), flush=True)
+
+    counts = {"collision": 0, "override": 0}
+    for record in records:
+        counts[record["type"]] += 1
+    counts["parsed"] = parsed
+    print(json.dumps({"summary": counts}), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import os
+
+from typing import Dict, List, Tuple
+
+from ..jsonfile import read_json, write_json
+from .fstree import IFileTree, extract_files
+
+# casefolded path -> [path, size, crc, path in the archive]
+Files = Dict[str, List]
+
+
+class InstallManifest:
+    # Per-file size and CRC of an installed mod, as listed in the archive
+    # it came from, so an update can tell which files actually changed
+
+    _path: str
+    _files: Files
+
+    def __init__(self, path: str):
+        self._path = path
+        data = read_json(path)
+        self._files = data.get("files", {}) if isinstance(data, dict) else {}
+
+    def files(self) -> Files:
+        return self._files
+
+    def set_files(self, files: Files):
+        self._files = files
+
+    def save(self):
+        write_json(self._path, {"files": self._files})
+
+    def remove(self):
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+    @staticmethod
+    def files_of(tree: IFileTree) -> Files:
+        # tree is a final layout fstree built from the archive listing
+        files = {}
+        for entry in tree.walk():
+            if entry.isFile():
+                path = entry.path("/")
+                files[path.casefold()] = [
+                    path,
+                    entry.size(),
+                    entry.crc(),
+                    entry.source(),
+                ]
+        return files
+
+    @staticmethod
+    def diff(old: Files, new: Files) -> Tuple[Files, Files, Files]:
+        # Returns (changed or added, unchanged, removed)
+        changed, unchanged = {}, {}
+        for key, record in new.items():
+            # Listings without CRCs can't tell same-size edits apart
+            previous = old.get(key)
+            if previous and record[2] and previous[1:3] == record[1:3]:
+                unchanged[key] = record
+            else:
+                changed[key] = record
+        removed = {key: old[key] for key in old if key not in new}
+        return changed, unchanged, removed
+
+    @staticmethod
+    def detach_files(tree: IFileTree, files: Files):
+        # Takes files out of a final tree, and the folders left empty
+        matched = []
+        for entry in tree:
+            if entry.isDir():
+                InstallManifest.detach_files(entry, files)
+                if not len(entry):
+                    matched.append(entry)
+            elif entry.path("/").casefold() in files:
+                matched.append(entry)
+        for entry in matched:
+            entry.detach()
+
+    @staticmethod
+    def restore_files(root: str, files: Files, archive_path: str) -> int:
+        # Extracts the files missing under root, returns how many were
+        missing = {
+            record[3]: os.path.join(root, record[0])
+            for record in files.values()
+            if not os.path.isfile(os.path.join(root, record[0]))
+        }
+        if missing:
+            extract_files(archive_path, missing)
+        return len(missing)
+
+    @staticmethod
+    def remove_files(root: str, files: Files):
+        for path, *_ in files.values():
+            file_path = os.path.join(root, path)
+            if os.path.isfile(file_path):
+                os.remove(file_path)
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import re
+
+from typing import Dict, List, Optional, Tuple
+
+from ..jsonfile import read_cache, write_cache
+from .descriptor import Descriptor
+
+
+class ModIndex:
+    # Installed mods by descriptor identity: Steam remote_file_id,
+    # normalized descriptor name and a digest of the installed files.
+    # Installed mods usually no longer have their descriptor.mod, so the
+    # identity is recorded at install time and the lookups stay O(1).
+    # Mods installed before that fall back to their MO2 name and the
+    # Steam id in their meta.ini url.
+
+    STEAM_URL: str = r"steamcommunity\.com/.*[?&]id=(\d+)"
+
+    CACHE_VERSION: int = 2
+    KEYS: List[str] = ["remote_file_id", "name", "digest"]
+
+    _cache_path: str
+    _mods: Dict[str, Dict[str, str]]
+    _lookup: Dict[str, Dict[str, str]]
+
+    def __init__(self, cache_path: str = ""):
+        self._cache_path = cache_path
+        self._mods = {}
+        self._lookup = {key: {} for key in self.KEYS}
+
+    # Persistence
+
+    def load(self) -> bool:
+        mods = read_cache(self._cache_path, self.CACHE_VERSION, "mods")
+        if mods is None:
+            return False
+
+        for mod_name, record in mods.items():
+            self._mods[mod_name] = record
+            self._link(mod_name)
+        return True
+
+    def save(self):
+        write_cache(self._cache_path, self.CACHE_VERSION, "mods", self._mods)
+
+    # Updates
+
+    def refresh(self, mods: List[Tuple]) -> int:
+        # mods is (name, root) or (name, root, remote_file_id,
+        # descriptor_name) as recorded on Workshop imports. Mods already
+        # indexed are kept as they are, new ones without a recorded
+        # identity are read from their descriptor.mod if they have one,
+        # or else from meta.ini and the mod name. Returns the number of
+        # changes.
+        wanted = {mod[0] for mod in mods}
+        changes = 0
+        for mod_name in list(self._mods):
+            if mod_name not in wanted:
+                self.remove_mod(mod_name)
+                changes += 1
+
+        for mod_name, root, *identity in mods:
+            if mod_name in self._mods:
+                continue
+            remote_file_id, descriptor_name = (identity + ["", ""])[:2]
+            descriptor_path = os.path.join(root, "descriptor.mod")
+            if not remote_file_id and os.path.isfile(descriptor_path):
+                try:
+                    descriptor = Descriptor(descriptor_path)
+                    remote_file_id = descriptor.remote_file_id()
+                    descriptor_name = descriptor.name()
+                except (OSError, UnicodeDecodeError):
+                    pass
+            if not remote_file_id:
+                remote_file_id = self._steam_id(root)
+            self.set_mod(mod_name, remote_file_id, descriptor_name or mod_name)
+            changes += 1
+        return changes
+
+    def set_mod(
+        self,
+        mod_name: str,
+        remote_file_id: str = "",
+        descriptor_name: str = "",
+        digest: str = "",
+    ):
+        if mod_name in self._mods:
+            self._unlink(mod_name)
+        self._mods[mod_name] = {
+            "remote_file_id": remote_file_id.strip(),
+            "name": self.normalize_name(descriptor_name),
+            "digest": digest,
+        }
+        self._link(mod_name)
+
+    def remove_mod(self, mod_name: str):
+        if mod_name not in self._mods:
+            return
+        self._unlink(mod_name)
+        del self._mods[mod_name]
+
+    # Queries
+
+    def find(
+        self,
+        remote_file_id: str = "",
+        descriptor_name: str = "",
+        digest: str = "",
+    ) -> Optional[str]:
+        # The installed mod an archive updates, the Workshop id is the
+        # most reliable match and the descriptor name the least
+        values = {
+            "remote_file_id": remote_file_id.strip(),
+            "digest": digest,
+            "name": self.normalize_name(descriptor_name),
+        }
+        for key, value in values.items():
+            if value and value in self._lookup[key]:
+                return self._lookup[key][value]
+        return None
+
+    def mods(self) -> List[str]:
+        return list(self._mods)
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        # "My Mod v1.2" and "my_mod 1.3" both become "mymod"
+        name = name.strip().casefold()
+        name = re.sub(r"[\s_-]*v?\d+(\.\d+)+[a-z]?$", "", name)
+        return "".join(c for c in name if c.isalnum())
+
+    @staticmethod
+    def digest(files: Dict[str, List]) -> str:
+        # files as recorded by InstallManifest, casefolded path ->
+        # [path, size, crc, ...]
+        if not files:
+            return ""
+        sha1 = hashlib.sha1()
+        for key in sorted(files):
+            size, crc = files[key][1:3]
+            sha1.update("{}\0{}\0{}\n".format(key, size, crc).encode())
+        return sha1.hexdigest()
+
+    # Internals
+
+    @staticmethod
+    def _steam_id(root: str) -> str:
+        # MO2 keeps the mod's page in meta.ini, for Workshop mods that is
+        # the Steam page holding the id
+        try:
+            with open(
+                os.path.join(root, "meta.ini"), "r", encoding="utf-8"
+            ) as f:
+                for line in f:
+                    key, sep, value = line.partition("=")
+                    if sep and key.strip() == "url":
+                        match = re.search(ModIndex.STEAM_URL, value)
+                        return match.group(1) if match else ""
+        except (OSError, UnicodeDecodeError):
+            pass
+        return ""
+
+    def _link(self, mod_name: str):
+        for key in self.KEYS:
+            value = self._mods[mod_name].get(key)
+            if value:
+                self._lookup[key][value] = mod_name
+
+    def _unlink(self, mod_name: str):
+        for key in self.KEYS:
+            value = self._mods[mod_name].get(key)
+            if value and self._lookup[key].get(value) == mod_name:
+                del self._lookup[key][value]
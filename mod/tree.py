@@ -1,6 +1,12 @@
-import mobase
+try:
+    import mobase
+except ImportError:
+    # Outside of MO2, see fstree
+    from . import fstree as mobase
 from typing import List
 
+from .exclusions import ExclusionFilter
+
 
 class TreeHelper:
     VALID_DIRS: List[str] = [
@@ -25,6 +31,23 @@ class TreeHelper:
         "tweakergui_assets",
     ]
 
+    # Entries iterated by the helpers below while counting is on, reported
+    # by Instrumentation
+    counting: bool = False
+    visited: int = 0
+
+    @staticmethod
+    def _entries(tree: mobase.IFileTree):
+        if not TreeHelper.counting:
+            return tree
+        return TreeHelper._counted(tree)
+
+    @staticmethod
+    def _counted(tree: mobase.IFileTree):
+        for entry in tree:
+            TreeHelper.visited += 1
+            yield entry
+
     # Descriptors & Content
 
     @staticmethod
@@ -47,7 +70,7 @@ class TreeHelper:
             return descriptor
 
         if deep:
-            for entry in tree:
+            for entry in TreeHelper._entries(tree):
                 if entry.isDir():
                     descriptor = TreeHelper.find_mod_descriptor(entry, True)
                     if descriptor:
@@ -59,13 +82,13 @@ class TreeHelper:
     def find_install_descriptor(
         tree: mobase.IFileTree, deep: bool = False
     ) -> mobase.FileTreeEntry:
-        for entry in tree:
+        for entry in TreeHelper._entries(tree):
             if entry.isFile():
                 if entry.suffix() == "mod":
                     return entry
 
         if deep:
-            for entry in tree:
+            for entry in TreeHelper._entries(tree):
                 if entry.isDir():
                     descriptor = TreeHelper.find_install_descriptor(
                         entry, True
@@ -98,7 +121,7 @@ class TreeHelper:
         if thumbnail:
             return thumbnail
 
-        for entry in tree:
+        for entry in TreeHelper._entries(tree):
             if entry.isDir():
                 thumbnail = TreeHelper.find_thumbnail(entry)
                 if thumbnail:
@@ -110,7 +133,7 @@ class TreeHelper:
 
     @staticmethod
     def has_dirs(tree: mobase.IFileTree) -> bool:
-        for entry in tree:
+        for entry in TreeHelper._entries(tree):
             if entry.isDir():
                 return True
         return False
@@ -121,7 +144,7 @@ class TreeHelper:
 
     @staticmethod
     def validate_dirs(tree: mobase.IFileTree) -> bool:
-        for entry in tree:
+        for entry in TreeHelper._entries(tree):
             if entry.isDir():
                 if not TreeHelper.validate_dir(entry):
                     return False
@@ -131,7 +154,7 @@ class TreeHelper:
 
     @staticmethod
     def has_files(tree: mobase.IFileTree) -> bool:
-        for entry in tree:
+        for entry in TreeHelper._entries(tree):
             if entry.isFile():
                 return True
         return False
@@ -164,7 +187,9 @@ class TreeHelper:
         return TreeHelper.validate_dirs(tree)
 
     @staticmethod
-    def to_installable(tree: mobase.IFileTree) -> mobase.IFileTree:
+    def to_installable(
+        tree: mobase.IFileTree, exclusions: ExclusionFilter = None
+    ) -> mobase.IFileTree:
         new_tree = tree.createOrphanTree("")
         descriptor = TreeHelper.find_descriptor(tree, deep=True)
         thumbnail = TreeHelper.find_thumbnail(tree)
@@ -173,9 +198,17 @@ class TreeHelper:
             if thumbnail:
                 new_tree.copy(thumbnail)
             content = TreeHelper.get_content_source(descriptor)
-            for entry in content:
+            for entry in TreeHelper._entries(content):
                 if entry.isDir():
-                    new_tree.copy(entry)
+                    copied = new_tree.copy(entry)
+                    if not exclusions:
+                        continue
+                    if exclusions.matches(entry.name()):
+                        exclusions.exclude(copied)
+                        continue
+                    removed = exclusions.apply(copied, entry.name())
+                    if removed and not len(copied):
+                        copied.detach()
             return new_tree if TreeHelper.is_installable(new_tree) else None
         return None
 
@@ -191,10 +224,12 @@ class TreeHelper:
         return TreeHelper.validate_dirs(tree)
 
     @staticmethod
-    def to_final(tree: mobase.IFileTree) -> mobase.IFileTree:
-        tree = TreeHelper.to_installable(tree)
+    def to_final(
+        tree: mobase.IFileTree, exclusions: ExclusionFilter = None
+    ) -> mobase.IFileTree:
+        tree = TreeHelper.to_installable(tree, exclusions)
         new_tree = tree.createOrphanTree("")
-        for entry in tree:
+        for entry in TreeHelper._entries(tree):
             if entry.isDir():
                 new_tree.copy(entry)
         return new_tree if TreeHelper.is_final(new_tree) else None
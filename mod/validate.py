@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from .fstree import tree_from_path
+from .tree import TreeHelper
+
+# Headless archive validation, run from the folder containing the plugin:
+#   python -m <plugin folder>.mod.validate <archives or folders>
+
+FINAL: str = "final"
+INSTALLABLE: str = "installable"
+INVALID: str = "invalid"
+ERROR: str = "error"
+
+ARCHIVE_SUFFIXES: List[str] = [".7z", ".rar", ".zip"]
+
+
+def classify(path: str) -> Dict[str, str]:
+    # Same decisions MO2 makes: ModDataChecker for final layouts, then
+    # ArchiveInstaller for anything it can turn into one
+    try:
+        tree = tree_from_path(path)
+    except Exception as e:
+        return {"path": path, "result": ERROR, "error": str(e)}
+
+    if TreeHelper.is_final(tree):
+        result = FINAL
+    elif TreeHelper.can_be_installable(tree) and TreeHelper.to_final(tree):
+        result = INSTALLABLE
+    else:
+        result = INVALID
+    return {"path": path, "result": result}
+
+
+def find_archives(paths: List[str]) -> List[str]:
+    archives = []
+    for path in paths:
+        if not os.path.isdir(path):
+            archives.append(path)
+            continue
+        with os.scandir(path) as it:
+            for entry in sorted(it, key=lambda e: e.name.casefold()):
+                suffix = os.path.splitext(entry.name)[1].casefold()
+                if entry.is_file() and suffix in ARCHIVE_SUFFIXES:
+                    archives.append(entry.path)
+    return archives
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Classify Crusader Kings III mod archives as final, "
+        "installable or invalid"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="archives, or folders to scan for archives",
+    )
+    parser.add_argument(
+        "--unpacked",
+        action="store_true",
+        help="treat folder arguments as unpacked mods",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    paths = args.paths if args.unpacked else find_archives(args.paths)
+    counts = {FINAL: 0, INSTALLABLE: 0, INVALID: 0, ERROR: 0}
+    with ProcessPoolExecutor(args.workers) as executor:
+        for report in executor.map(classify, paths, chunksize=4):
+            counts[report["result"]] += 1
+            print(json.dumps(report), flush=True)
+
+    print(json.dumps({"summary": counts}), file=sys.stderr)
+    return 0 if not counts[INVALID] and not counts[ERROR] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import errno
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from .descriptor import Descriptor, clean_mod_name
+from .tree import TreeHelper
+
+
+class WorkshopMod:
+    _item_id: str
+    _path: str
+    _descriptor: Descriptor
+
+    def __init__(self, item_id: str, path: str, descriptor: Descriptor):
+        self._item_id = item_id
+        self._path = path
+        self._descriptor = descriptor
+
+    def item_id(self) -> str:
+        return self._item_id
+
+    def path(self) -> str:
+        return self._path
+
+    def descriptor(self) -> Descriptor:
+        return self._descriptor
+
+    def name(self) -> str:
+        return clean_mod_name(self._descriptor.name() or self._item_id)
+
+    def content_dirs(self) -> List[str]:
+        return [
+            entry.name
+            for entry in os.scandir(self._path)
+            if entry.is_dir()
+            and entry.name.casefold() in TreeHelper.VALID_DIRS
+        ]
+
+
+class WorkshopImporter:
+    # Imports Steam Workshop items into the MO2 mods directory in their
+    # final layout. Files are hardlinked, so an import costs no disk space
+    # unless the mods directory is on another filesystem.
+
+    IMPORTED: str = "imported"
+    EXISTS: str = "exists"
+    FAILED: str = "failed"
+
+    # Hardlink errors that mean "can't link here", anything else (like an
+    # existing target) is a real failure and must not turn into a copy
+    COPY_ERRNOS: List[int] = [
+        errno.EXDEV,
+        errno.EPERM,
+        errno.ENOSYS,
+        errno.EOPNOTSUPP,
+        getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+    ]
+
+    _mods_path: str
+    _max_workers: Optional[int]
+
+    def __init__(self, mods_path: str, max_workers: int = None):
+        self._mods_path = mods_path
+        self._max_workers = max_workers
+
+    # Scanning
+
+    @staticmethod
+    def scan(workshop_path: str) -> List[WorkshopMod]:
+        mods = []
+        try:
+            entries = sorted(os.scandir(workshop_path), key=lambda e: e.name)
+        except OSError:
+            return mods
+
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            mod = WorkshopImporter.read(entry.name, entry.path)
+            if mod:
+                mods.append(mod)
+        return mods
+
+    @staticmethod
+    def read(item_id: str, path: str) -> Optional[WorkshopMod]:
+        descriptor_path = os.path.join(path, "descriptor.mod")
+        if not os.path.isfile(descriptor_path):
+            return None
+
+        # Same rules as TreeHelper.is_installable: directories, all valid
+        dirs = [entry for entry in os.scandir(path) if entry.is_dir()]
+        if not dirs:
+            return None
+        for entry in dirs:
+            if entry.name.casefold() not in TreeHelper.VALID_DIRS:
+                return None
+
+        try:
+            descriptor = Descriptor(descriptor_path)
+        except (OSError, UnicodeDecodeError):
+            return None
+        return WorkshopMod(item_id, path, descriptor)
+
+    # Importing
+
+    def import_mods(
+        self, mods: List[WorkshopMod]
+    ) -> List[Tuple[WorkshopMod, str, str]]:
+        # Returns (mod, name of the imported folder, result)
+        # Target names are settled before the pool starts, items sharing a
+        # descriptor name get their item id appended
+        names = []
+        taken = set()
+        for mod in mods:
+            name = mod.name()
+            if name.casefold() in taken:
+                name = "{} {}".format(name, mod.item_id())
+            taken.add(name.casefold())
+            names.append(name)
+
+        with ThreadPoolExecutor(self._max_workers) as executor:
+            results = executor.map(self.import_mod, mods, names)
+            return list(zip(mods, names, results))
+
+    def import_mod(self, mod: WorkshopMod, name: str = None) -> str:
+        target = os.path.join(self._mods_path, name or mod.name())
+        try:
+            os.makedirs(self._mods_path, exist_ok=True)
+            # Claims the folder, only one import can create it
+            os.mkdir(target)
+        except FileExistsError:
+            return self.EXISTS
+        except OSError:
+            return self.FAILED
+
+        try:
+            for content_dir in mod.content_dirs():
+                self._link_tree(
+                    os.path.join(mod.path(), content_dir),
+                    os.path.join(target, content_dir),
+                )
+            self._write_meta(mod, target)
+        except OSError:
+            shutil.rmtree(target, ignore_errors=True)
+            return self.FAILED
+        return self.IMPORTED
+
+    @staticmethod
+    def _link_tree(source: str, target: str):
+        for dir_path, _, file_names in os.walk(source):
+            target_dir = os.path.join(
+                target, os.path.relpath(dir_path, source)
+            )
+            os.makedirs(target_dir, exist_ok=True)
+            for file_name in file_names:
+                source_file = os.path.join(dir_path, file_name)
+                target_file = os.path.join(target_dir, file_name)
+                try:
+                    os.link(source_file, target_file)
+                except OSError as e:
+                    if e.errno not in WorkshopImporter.COPY_ERRNOS:
+                        raise
+                    # Different filesystem (or no hardlink support)
+                    shutil.copy2(source_file, target_file)
+
+    @staticmethod
+    def _write_meta(mod: WorkshopMod, target: str):
+        url = "https://steamcommunity.com/sharedfiles/filedetails/?id={}"
+        lines = [
+            "[General]",
+            "version={}".format(mod.descriptor().version()),
+            "url={}".format(url.format(mod.item_id())),
+            "hasCustomURL=true",
+            "repository=Steam",
+        ]
+        with open(
+            os.path.join(target, "meta.ini"), "w", encoding="utf-8"
+        ) as meta_file:
+            meta_file.write("\n".join(lines) + "\n")
@@ -0,0 +1,22 @@
+import mobase
+import os
+
+from typing import List
+
+# Organizer helpers shared by the plugins in this package
+
+
+def plugin_data_path(organizer: mobase.IOrganizer, name: str) -> str:
+    return os.path.join(organizer.pluginDataPath(), "crusaderkings3", name)
+
+
+def indexable_mods(organizer: mobase.IOrganizer) -> List[mobase.IModInterface]:
+    # Real mods in priority order, lowest first
+    mod_list = organizer.modList()
+    mods = []
+    for name in mod_list.allModsByProfilePriority():
+        mod = mod_list.getMod(name)
+        if not mod or mod.isSeparator() or mod.isForeign():
+            continue
+        mods.append(mod)
+    return mods
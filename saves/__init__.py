@@ -0,0 +1 @@
+from .plugin import SaveArchiveTool  # noqa: F401  # type: ignore
@@ -0,0 +1,124 @@
+try:
+    from PyQt6.QtGui import QIcon
+    from PyQt6.QtWidgets import QInputDialog, QMessageBox
+except Exception:
+    from PyQt5.QtGui import QIcon
+    from PyQt5.QtWidgets import QInputDialog, QMessageBox
+
+import mobase
+
+from typing import List
+
+from ..localization import localize_string
+
+
+class SaveArchiveTool(mobase.IPluginTool):
+    _organizer: mobase.IOrganizer
+
+    def __init__(self):
+        super().__init__()
+
+    # IPlugin Implementation
+
+    def init(self, organizer: mobase.IOrganizer) -> bool:
+        self._organizer = organizer
+        return True
+
+    def name(self) -> str:
+        return "Crusader Kings III Save Archive"
+
+    def localizedName(self) -> str:
+        return localize_string(self.name())
+
+    def author(self) -> str:
+        return "Cram42"
+
+    def description(self) -> str:
+        return localize_string(
+            "Restores Crusader Kings III saves moved into the save archive"
+        )
+
+    def version(self) -> mobase.VersionInfo:
+        return mobase.VersionInfo(0, 1, 0)
+
+    def isActive(self) -> bool:
+        game = self._organizer.managedGame()
+        return bool(game) and game.name() == "Crusader Kings III"
+
+    def settings(self) -> List[mobase.PluginSetting]:
+        return []
+
+    # IPluginTool Implementation
+
+    def displayName(self) -> str:
+        return localize_string("Restore Archived Save")
+
+    def tooltip(self) -> str:
+        return self.description()
+
+    def icon(self) -> QIcon:
+        return QIcon()
+
+    def display(self):
+        game = self._organizer.managedGame()
+        saves = sorted(
+            game.archivedSaves(),
+            key=lambda save: save.getCreationTime().toSecsSinceEpoch(),
+            reverse=True,
+        )
+        if not saves:
+            QMessageBox.information(
+                self._parentWidget(),
+                self.displayName(),
+                localize_string("There are no archived saves"),
+            )
+            return
+
+        labels = [
+            "{} - {}".format(
+                save.getName(),
+                save.getCreationTime().toString("yyyy-MM-dd hh:mm"),
+            )
+            for save in saves
+        ]
+        label, accepted = QInputDialog.getItem(
+            self._parentWidget(),
+            self.displayName(),
+            localize_string("Save to restore:"),
+            labels,
+            0,
+            False,
+        )
+        if not accepted:
+            return
+
+        save = saves[labels.index(label)]
+        try:
+            path = game.restoreSave(save)
+        except (OSError, KeyError, ValueError) as e:
+            QMessageBox.critical(
+                self._parentWidget(),
+                self.displayName(),
+                localize_string("Failed to restore {}: {}").format(
+                    save.file(), e
+                ),
+            )
+            return
+        if not path:
+            QMessageBox.information(
+                self._parentWidget(),
+                self.displayName(),
+                localize_string(
+                    "Saves are being archived, try again in a moment"
+                ),
+            )
+            return
+        self._organizer.refresh()
+        QMessageBox.information(
+            self._parentWidget(),
+            self.displayName(),
+            localize_string(
+                "Restored to {}\nIt stays out of the archive until it is "
+                "saved over"
+            ).format(path),
+        )
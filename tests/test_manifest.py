@@ -0,0 +1,118 @@
+import os
+import zipfile
+
+import pytest
+
+from ..mod.fstree import IFileTree, tree_from_zip
+from ..mod.manifest import InstallManifest
+from ..mod.tree import TreeHelper
+
+
+def _record(path, size, crc):
+    return [path, size, crc, path]
+
+
+def _files(*records):
+    return {record[0].casefold(): record for record in records}
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+def test_diff():
+    old = _files(
+        _record("common/a.txt", 10, 1),
+        _record("common/b.txt", 10, 2),
+        _record("common/gone.txt", 10, 3),
+    )
+    new = _files(
+        _record("common/a.txt", 10, 1),
+        _record("common/b.txt", 10, 4),
+        _record("common/new.txt", 10, 5),
+    )
+    changed, unchanged, removed = InstallManifest.diff(old, new)
+    assert set(changed) == {"common/b.txt", "common/new.txt"}
+    assert set(unchanged) == {"common/a.txt"}
+    assert set(removed) == {"common/gone.txt"}
+
+
+def test_diff_without_crc_is_changed():
+    old = _files(_record("common/defines.txt", 10, 0))
+    new = _files(_record("common/defines.txt", 10, 0))
+    changed, unchanged, removed = InstallManifest.diff(old, new)
+    assert set(changed) == {"common/defines.txt"}
+    assert not unchanged and not removed
+
+
+def test_detach_files():
+    tree = IFileTree()
+    tree.addFile("common/a.txt")
+    tree.addFile("common/b.txt")
+    tree.addFile("gfx/icon.dds")
+    InstallManifest.detach_files(
+        tree,
+        _files(_record("common/a.txt", 1, 1), _record("gfx/icon.dds", 1, 1)),
+    )
+    assert tree.find("common/b.txt")
+    assert not tree.find("common/a.txt")
+    assert not tree.find("gfx")
+
+
+def test_restore_files(tmp_path):
+    archive = _zip(
+        str(tmp_path / "mod.zip"),
+        {
+            "My Mod/descriptor.mod": 'name="My Mod"',
+            "My Mod/common/a.txt": "a",
+            "My Mod/common/b.txt": "b",
+        },
+    )
+    final_tree = TreeHelper.to_final(tree_from_zip(archive))
+    files = InstallManifest.files_of(final_tree)
+    assert files["common/a.txt"][3] == "My Mod/common/a.txt"
+
+    root = tmp_path / "installed"
+    (root / "common").mkdir(parents=True)
+    (root / "common" / "b.txt").write_text("kept")
+
+    assert InstallManifest.restore_files(str(root), files, archive) == 1
+    assert (root / "common" / "a.txt").read_text() == "a"
+    assert (root / "common" / "b.txt").read_text() == "kept"
+    assert InstallManifest.restore_files(str(root), files, archive) == 0
+
+
+def test_restore_files_failure(tmp_path):
+    archive = _zip(str(tmp_path / "mod.zip"), {"common/a.txt": "a"})
+    files = _files(_record("common/missing.txt", 1, 1))
+    with pytest.raises(KeyError):
+        InstallManifest.restore_files(str(tmp_path), files, archive)
+
+
+def test_remove_files(tmp_path):
+    (tmp_path / "common").mkdir()
+    (tmp_path / "common" / "gone.txt").write_text("x")
+    (tmp_path / "common" / "kept.txt").write_text("x")
+    InstallManifest.remove_files(
+        str(tmp_path),
+        _files(
+            _record("common/gone.txt", 1, 1),
+            _record("common/never.txt", 1, 1),
+        ),
+    )
+    assert not (tmp_path / "common" / "gone.txt").exists()
+    assert (tmp_path / "common" / "kept.txt").exists()
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "manifests" / "My Mod.json")
+    files = _files(_record("common/a.txt", 1, 1))
+    manifest = InstallManifest(path)
+    manifest.set_files(files)
+    manifest.save()
+    assert InstallManifest(path).files() == files
+    manifest.remove()
+    assert not os.path.exists(path)
@@ -0,0 +1 @@
+from .plugin import WorkshopTool  # noqa: F401  # type: ignore
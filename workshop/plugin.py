@@ -0,0 +1,131 @@
+try:
+    from PyQt6.QtGui import QIcon
+    from PyQt6.QtWidgets import QMessageBox
+except Exception:
+    from PyQt5.QtGui import QIcon
+    from PyQt5.QtWidgets import QMessageBox
+
+import json
+import mobase
+
+from typing import List
+
+from ..mod import WorkshopImporter
+from ..localization import localize_string
+
+
+class WorkshopTool(mobase.IPluginTool):
+    _organizer: mobase.IOrganizer
+
+    def __init__(self):
+        super().__init__()
+
+    # IPlugin Implementation
+
+    def init(self, organizer: mobase.IOrganizer) -> bool:
+        self._organizer = organizer
+        return True
+
+    def name(self) -> str:
+        return "Crusader Kings III Workshop Importer"
+
+    def localizedName(self) -> str:
+        return localize_string(self.name())
+
+    def author(self) -> str:
+        return "Cram42"
+
+    def description(self) -> str:
+        return localize_string(
+            "Imports Crusader Kings III mods from the Steam Workshop"
+        )
+
+    def version(self) -> mobase.VersionInfo:
+        return mobase.VersionInfo(0, 1, 0)
+
+    def isActive(self) -> bool:
+        game = self._organizer.managedGame()
+        return bool(game) and game.name() == "Crusader Kings III"
+
+    def settings(self) -> List[mobase.PluginSetting]:
+        return []
+
+    # IPluginTool Implementation
+
+    def displayName(self) -> str:
+        return localize_string("Import Workshop Mods")
+
+    def tooltip(self) -> str:
+        return self.description()
+
+    def icon(self) -> QIcon:
+        return QIcon()
+
+    def display(self):
+        workshop_dir = self._organizer.managedGame().workshopDirectory()
+        mods = WorkshopImporter.scan(workshop_dir.absolutePath())
+        if not mods:
+            QMessageBox.information(
+                self._parentWidget(),
+                self.displayName(),
+                localize_string("No workshop mods found in {}").format(
+                    workshop_dir.absolutePath()
+                ),
+            )
+            return
+
+        answer = QMessageBox.question(
+            self._parentWidget(),
+            self.displayName(),
+            localize_string("Import {} workshop mods?").format(len(mods)),
+        )
+        if answer != QMessageBox.Yes:
+            return
+
+        importer = WorkshopImporter(self._organizer.modsPath())
+        results = importer.import_mods(mods)
+        self._organizer.refresh()
+        self._recordDescriptors(results)
+
+        counts = {
+            WorkshopImporter.IMPORTED: 0,
+            WorkshopImporter.EXISTS: 0,
+            WorkshopImporter.FAILED: 0,
+        }
+        for _, _, result in results:
+            counts[result] += 1
+        QMessageBox.information(
+            self._parentWidget(),
+            self.displayName(),
+            localize_string(
+                "Imported: {}\nAlready installed: {}\nFailed: {}"
+            ).format(
+                counts[WorkshopImporter.IMPORTED],
+                counts[WorkshopImporter.EXISTS],
+                counts[WorkshopImporter.FAILED],
+            ),
+        )
+
+    def _recordDescriptors(self, results: List):
+        # descriptor.mod isn't imported, keep what the game plugin's
+        # conflict index and the installer's mod index need from it
+        game_name = self._organizer.managedGame().name()
+        mod_list = self._organizer.modList()
+        for mod, name, result in results:
+            if result != WorkshopImporter.IMPORTED:
+                continue
+            imported = mod_list.getMod(name)
+            if not imported:
+                continue
+            descriptor = mod.descriptor()
+            imported.setPluginSetting(
+                game_name, "remote_file_id", mod.item_id()
+            )
+            imported.setPluginSetting(
+                game_name, "descriptor_name", descriptor.name()
+            )
+            imported.setPluginSetting(
+                game_name,
+                "replace_paths",
+                json.dumps(descriptor.replace_paths()),
+            )